@@ -0,0 +1,67 @@
+"""
+create_order latency for 1 / 10 / 50 line carts: per-line session.get
+(previous implementation) versus one IN (...) lookup plus bulk INSERT.
+
+    cd backend && python -m benchmarks.bench_create_order
+"""
+from sqlmodel import Session
+
+from benchmarks.bench_menu import seed_restaurant
+from benchmarks.common import temp_database_url, make_engines, time_call
+from crud.orders_crud import create_order
+from database.models import Order, OrderItem, Menu, OrderStatus, User
+
+CART_SIZES = [1, 10, 50]
+
+
+def legacy_create_order(session, user_id, restaurant_id, items, payment_image=None):
+    """Previous implementation: one session.get and one OrderItem add per cart line"""
+    total_amount = 0
+    order = Order(
+        user_id=user_id,
+        restaurant_id=restaurant_id,
+        status=OrderStatus.PLACED,
+        total_amount=0,
+        payment_image=payment_image
+    )
+    session.add(order)
+    session.flush()
+    for item in items:
+        menu = session.get(Menu, item["menu_id"])
+        if not menu or not menu.is_available:
+            session.rollback()
+            return None
+        quantity = int(item["quantity"])
+        total_amount += menu.price * quantity
+        session.add(OrderItem(order_id=order.id, menu_id=menu.id, quantity=quantity, price=menu.price))
+    order.total_amount = total_amount
+    session.commit()
+    session.refresh(order)
+    return order
+
+
+def main():
+    engine, async_engine = make_engines(temp_database_url("orders"))
+    restaurant_id = seed_restaurant(engine, 100, 5)
+    with Session(engine) as session:
+        user = User(name="Bench", email="bench@example.com", mobile="9000000000",
+                    password="x", address="Bench street 1")
+        session.add(user)
+        session.commit()
+        user_id = user.id
+
+    print(f"{'lines':>5} | {'legacy p50':>10} {'batched p50':>11}")
+    for size in CART_SIZES:
+        cart = [{"menu_id": menu_id, "quantity": 2} for menu_id in range(1, size + 1)]
+        results = {}
+        for name, fn in (("legacy", legacy_create_order), ("batched", create_order)):
+            def run():
+                # Fresh session per order, as in a request
+                with Session(engine) as session:
+                    assert fn(session, user_id, restaurant_id, cart) is not None
+            results[name] = time_call(run, repeat=50)
+        print(f"{size:>5} | {results['legacy']['p50']:>8.2f}ms {results['batched']['p50']:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
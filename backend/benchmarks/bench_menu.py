@@ -0,0 +1,107 @@
+"""
+GET /menu/{restaurant_id} latency versus menu size.
+
+Compares the old two-query + nested comprehension grouping with the
+single ordered query used by crud.async_menu_crud.get_restaurant_menu_grouped.
+
+    cd backend && python -m benchmarks.bench_menu
+"""
+import asyncio
+from datetime import time
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from benchmarks.common import temp_database_url, make_engines, time_async_call
+from crud.async_menu_crud import get_restaurant_menu_grouped
+from database.models import Restaurant, Category, Menu
+
+# (menu items, categories)
+MENU_SIZES = [(20, 4), (100, 10), (500, 25), (2000, 50)]
+
+
+def seed_restaurant(engine, item_count: int, category_count: int) -> int:
+    with Session(engine) as session:
+        restaurant = Restaurant(
+            name=f"Bench {item_count}",
+            address="Bench street 1",
+            email=f"bench{item_count}_{category_count}@example.com",
+            password="x",
+            mobile="9000000000"
+        )
+        session.add(restaurant)
+        session.flush()
+        categories = [
+            Category(
+                name=f"category {i}",
+                start_time=time(0, 0),
+                end_time=time(23, 59),
+                restaurant_id=restaurant.id
+            )
+            for i in range(category_count)
+        ]
+        session.add_all(categories)
+        session.flush()
+        session.add_all([
+            Menu(
+                name=f"item {i}",
+                price=100 + i,
+                restaurant_id=restaurant.id,
+                category_id=categories[i % category_count].id,
+                menu_item_pic=f"uploads/menu_items/{i}.webp"
+            )
+            for i in range(item_count)
+        ])
+        session.commit()
+        return restaurant.id
+
+
+async def legacy_menu(session: AsyncSession, restaurant_id: int) -> dict:
+    """Previous implementation: two queries, O(categories x items) bucketing"""
+    menu_items = (await session.exec(select(Menu).where(Menu.restaurant_id == restaurant_id))).all()
+    categories = (await session.exec(
+        select(Category).where(Category.restaurant_id == restaurant_id)
+    )).all()
+    menu_by_category = {}
+    for category in categories:
+        category_items = [
+            {
+                "id": item.id,
+                "name": item.name,
+                "price": item.price,
+                "is_available": item.is_available,
+                "menu_item_pic": item.menu_item_pic
+            }
+            for item in menu_items if item.category_id == category.id
+        ]
+        if category_items:
+            menu_by_category[category.name] = {
+                "category_id": category.id,
+                "start_time": str(category.start_time) if category.start_time else None,
+                "end_time": str(category.end_time) if category.end_time else None,
+                "items": category_items
+            }
+    return menu_by_category
+
+
+async def main():
+    engine, async_engine = make_engines(temp_database_url("menu"))
+    print(f"{'items':>6} {'cats':>5} | {'legacy p50':>11} {'grouped p50':>12} | speedup")
+    for item_count, category_count in MENU_SIZES:
+        restaurant_id = seed_restaurant(engine, item_count, category_count)
+        async with AsyncSession(async_engine) as session:
+            assert await legacy_menu(session, restaurant_id) == \
+                await get_restaurant_menu_grouped(session, restaurant_id)
+            legacy = await time_async_call(lambda: legacy_menu(session, restaurant_id))
+            grouped = await time_async_call(
+                lambda: get_restaurant_menu_grouped(session, restaurant_id)
+            )
+        print(
+            f"{item_count:>6} {category_count:>5} | {legacy['p50']:>9.2f}ms {grouped['p50']:>10.2f}ms"
+            f" | {legacy['p50'] / grouped['p50']:.1f}x"
+        )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+GET /menu/dashboard/search latency: FTS5 prefix index versus ILIKE scan.
+
+    cd backend && python -m benchmarks.bench_search [menu_count]
+"""
+import asyncio
+import random
+import sys
+from datetime import time
+
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from benchmarks.common import temp_database_url, make_engines, time_async_call
+from crud.async_menu_crud import search_dashboard_menu
+from database.models import Restaurant, Category, Menu
+from database.search_index import create_search_index, search_index_state
+
+WORDS = [
+    "chicken", "paneer", "mutton", "veg", "biryani", "tikka", "dosa", "idly",
+    "vada", "masala", "butter", "garlic", "naan", "kulfi", "lassi", "mojito",
+    "manchurian", "fried", "rice", "noodles", "soup", "kebab", "tandoori", "curry",
+]
+QUERIES = ["chi", "paneer tik", "biryani", "garlic naan", "zzz"]
+
+
+def seed(engine, menu_count: int, restaurant_count: int = 500):
+    rng = random.Random(7)
+    with engine.begin() as connection:
+        connection.execute(insert(Restaurant), [
+            {
+                "id": r + 1,
+                "name": f"{rng.choice(WORDS).title()} House {r}",
+                "address": "Bench street 1",
+                "email": f"bench{r}@example.com",
+                "password": "x",
+                "mobile": "9000000000",
+            }
+            for r in range(restaurant_count)
+        ])
+        connection.execute(insert(Category), [
+            {"id": r + 1, "name": "all day", "start_time": time(0, 0),
+             "end_time": time(23, 59), "restaurant_id": r + 1}
+            for r in range(restaurant_count)
+        ])
+        connection.execute(insert(Menu), [
+            {
+                "name": " ".join(rng.sample(WORDS, 3)),
+                "price": 100,
+                "is_available": True,
+                "restaurant_id": (i % restaurant_count) + 1,
+                "category_id": (i % restaurant_count) + 1,
+            }
+            for i in range(menu_count)
+        ])
+
+
+async def main(menu_count: int):
+    engine, async_engine = make_engines(temp_database_url("search"))
+    seed(engine, menu_count)
+    create_search_index(engine)
+
+    print(f"{menu_count} menu items")
+    print(f"{'query':>12} | {'ilike p50':>10} {'fts p50':>9}")
+    async with AsyncSession(async_engine) as session:
+        for query in QUERIES:
+            search_index_state["enabled"] = False
+            ilike = await time_async_call(lambda: search_dashboard_menu(session, query), repeat=5)
+            search_index_state["enabled"] = True
+            fts = await time_async_call(lambda: search_dashboard_menu(session, query))
+            print(f"{query:>12} | {ilike['p50']:>8.2f}ms {fts['p50']:>7.2f}ms")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
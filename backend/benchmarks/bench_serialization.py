@@ -0,0 +1,114 @@
+"""
+Response serialization cost for large order histories and menus.
+
+Compares, per payload:
+  stdlib   - jsonable_encoder + json.dumps (FastAPI's default JSONResponse path)
+  orjson   - jsonable_encoder + FastJSONResponse (untyped routes today)
+  typed    - response_model validate + dump in pydantic-core, then FastJSONResponse
+             (the hot endpoints with typed models in routers/schemas.py)
+  direct   - services.json_response.dumps on an already plain payload
+             (the cached menu body)
+
+    cd backend && python -m benchmarks.bench_serialization
+"""
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from benchmarks.common import time_call
+from database.models import OrderStatus
+from routers.schemas import or_error, UserOrdersPage
+from services.json_response import FastJSONResponse, dumps, orjson
+
+ORDER_COUNTS = [100, 1_000, 5_000]
+MENU_SIZES = [100, 1_000, 5_000]
+ITEMS_PER_ORDER = 4
+
+
+def order_history(order_count: int) -> dict:
+    """Shape of GET /orders/user/{user_id}/orders"""
+    now = datetime.utcnow()
+    orders = []
+    for i in range(order_count):
+        created = (now - timedelta(minutes=i)).isoformat()
+        orders.append({
+            "order_id": i + 1,
+            "status": OrderStatus.DELIVERED,
+            "total_amount": 450.0 + i,
+            "created_at": created,
+            "date": created,
+            "order_image": f"http://127.0.0.1:8000/uploads/menu_items/{i:032x}.jpg.320.webp",
+            "restaurant": {"id": i % 50 + 1, "name": f"Restaurant {i % 50}", "address": "Bench street 1"},
+            "items": [
+                {"menu_id": j + 1, "menu_item_name": f"item {j}", "quantity": 2,
+                 "menu_item_pic": f"http://127.0.0.1:8000/uploads/menu_items/{j:032x}.jpg.128.webp"}
+                for j in range(ITEMS_PER_ORDER)
+            ],
+        })
+    return {"status": "success", "orders": orders, "next_cursor": None, "has_more": False}
+
+
+def menu(item_count: int, category_count: int = 20) -> dict:
+    """Shape of GET /menu/{restaurant_id}"""
+    return {
+        "status": "success",
+        "restaurant_id": 1,
+        "menu": {
+            f"category {c}": {
+                "category_id": c + 1,
+                "start_time": "09:00:00",
+                "end_time": "23:00:00",
+                "items": [
+                    {"id": i + 1, "name": f"item {i}", "price": 100.0 + i, "is_available": True,
+                     "menu_item_pic": f"uploads/menu_items/{i:032x}.jpg",
+                     "menu_item_images": None}
+                    for i in range(c, item_count, category_count)
+                ],
+            }
+            for c in range(category_count)
+        },
+    }
+
+
+def stdlib_render(payload):
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def orjson_render(payload):
+    return FastJSONResponse(jsonable_encoder(payload)).body
+
+
+def typed_render(adapter):
+    def render(payload):
+        value = adapter.validate_python(payload, from_attributes=True)
+        return FastJSONResponse(adapter.dump_python(value, mode="json")).body
+    return render
+
+
+def report(label: str, payload, typed=None):
+    body_size = len(stdlib_render(payload))
+    results = {"stdlib": time_call(lambda: stdlib_render(payload), repeat=10)}
+    if orjson is not None:
+        results["orjson"] = time_call(lambda: orjson_render(payload), repeat=10)
+        results["direct"] = time_call(lambda: dumps(payload), repeat=10)
+    if typed is not None:
+        results["typed"] = time_call(lambda: typed(payload), repeat=10)
+    timings = "  ".join(f"{name} {stats['p50']:>8.2f}ms" for name, stats in results.items())
+    print(f"{label:>22} {body_size / 1024:>9.0f}KiB  {timings}")
+
+
+def main():
+    if orjson is None:
+        print("orjson is not installed; FastJSONResponse falls back to the stdlib encoder")
+    typed_orders = typed_render(TypeAdapter(or_error(UserOrdersPage)))
+    print(f"{'payload':>22} {'body':>12}  p50")
+    for order_count in ORDER_COUNTS:
+        report(f"{order_count} orders", order_history(order_count), typed_orders)
+    for item_count in MENU_SIZES:
+        report(f"{item_count} menu items", menu(item_count))
+
+
+if __name__ == "__main__":
+    main()
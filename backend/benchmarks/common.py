@@ -0,0 +1,54 @@
+import os
+import statistics
+import tempfile
+import time
+
+from sqlmodel import SQLModel
+
+from database.database import build_engine, build_async_engine
+
+
+def temp_database_url(name: str = "bench") -> str:
+    """Fresh SQLite file in the temp dir so benchmarks never touch the app database"""
+    path = os.path.join(tempfile.mkdtemp(prefix="food_bench_"), f"{name}.db")
+    return f"sqlite:///{path}"
+
+
+def make_engines(url: str):
+    engine = build_engine(url)
+    SQLModel.metadata.create_all(engine)
+    return engine, build_async_engine(url)
+
+
+def time_call(fn, repeat: int = 20) -> dict:
+    """Run fn() `repeat` times and return latency stats in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+async def time_async_call(fn, repeat: int = 20) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+    }
+
+
+def percentile(ordered, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
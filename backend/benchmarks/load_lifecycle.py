@@ -0,0 +1,240 @@
+"""
+End-to-end load test of the order lifecycle against the real FastAPI app.
+
+Seeds a synthetic dataset into a temp SQLite file, then runs concurrent
+virtual users in-process (httpx over ASGI, no network) through
+
+    register -> login -> menu -> search -> create order
+    -> PREPARING -> assign partner -> DELIVERED -> order history pages
+
+and prints p50 / p95 / p99 latency and throughput per endpoint.
+
+    cd backend && python -m benchmarks.load_lifecycle [scale] [virtual_users] [iterations]
+
+scale=1 seeds 1,000 restaurants, 20,000 menu items, 10,000 users, 2,000
+partners and 100,000 orders; scale=20 reaches two million orders.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, time as dt_time, timedelta
+
+# The app binds its engines when database.database is first imported (also by
+# benchmarks.common), so point it at a scratch database before any app import
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='food_bench_'), 'lifecycle.db')}"
+os.environ.setdefault("TOKEN_SECRET", "load-test-secret")
+
+import httpx
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from benchmarks.common import summarize
+from crud.order_summaries import backfill_order_summaries
+from database.database import engine, create_db_and_tables, dispose_engines
+from database.models import (
+    Restaurant, Category, Menu, User, DeliveryPartner, Order, OrderItem, OrderStatus
+)
+from main import app
+from services.image_variants import image_variants
+
+# Rows per restaurant at scale=1
+CATEGORIES_PER_RESTAURANT = 5
+MENUS_PER_RESTAURANT = 20
+BASE_RESTAURANTS = 1_000
+BASE_USERS = 10_000
+BASE_PARTNERS = 2_000
+BASE_ORDERS = 100_000
+ITEMS_PER_ORDER = 2
+SEED_CHUNK = 20_000
+
+WORDS = [
+    "chicken", "paneer", "mutton", "veg", "biryani", "tikka", "dosa", "idly",
+    "vada", "masala", "butter", "garlic", "naan", "kulfi", "lassi", "mojito",
+    "manchurian", "fried", "rice", "noodles", "soup", "kebab", "tandoori", "curry",
+]
+SEARCHES = ["chi", "paneer tik", "biryani", "garlic naan"]
+HISTORICAL_STATUSES = [OrderStatus.DELIVERED] * 8 + [OrderStatus.CANCELLED]
+PASSWORD = "Bench@1234"
+
+
+def insert_chunked(connection, model, rows):
+    for start in range(0, len(rows), SEED_CHUNK):
+        connection.execute(insert(model), rows[start:start + SEED_CHUNK])
+
+
+def seed(scale: int) -> dict:
+    """Bulk-insert the synthetic dataset and return the id ranges the workload draws from"""
+    rng = random.Random(42)
+    restaurant_count = BASE_RESTAURANTS * scale
+    user_count = BASE_USERS * scale
+    partner_count = BASE_PARTNERS * scale
+    order_count = BASE_ORDERS * scale
+    category_count = restaurant_count * CATEGORIES_PER_RESTAURANT
+    menu_count = restaurant_count * MENUS_PER_RESTAURANT
+    now = datetime.utcnow()
+
+    with engine.begin() as connection:
+        insert_chunked(connection, Restaurant, [
+            {"id": r, "name": f"{rng.choice(WORDS).title()} House {r}", "address": "Bench street 1",
+             "email": f"restaurant{r}@bench.example", "password": "x", "mobile": "9000000000"}
+            for r in range(1, restaurant_count + 1)
+        ])
+        insert_chunked(connection, Category, [
+            {"id": c, "name": f"category {c}", "start_time": dt_time(0, 0), "end_time": dt_time(23, 59),
+             "restaurant_id": (c - 1) // CATEGORIES_PER_RESTAURANT + 1}
+            for c in range(1, category_count + 1)
+        ])
+        insert_chunked(connection, Menu, [
+            {"id": m, "name": " ".join(rng.sample(WORDS, 3)), "price": rng.randint(50, 500),
+             "is_available": True, "restaurant_id": (m - 1) // MENUS_PER_RESTAURANT + 1,
+             "category_id": ((m - 1) // MENUS_PER_RESTAURANT) * CATEGORIES_PER_RESTAURANT
+                            + (m - 1) % CATEGORIES_PER_RESTAURANT + 1}
+            for m in range(1, menu_count + 1)
+        ])
+        insert_chunked(connection, User, [
+            {"id": u, "name": f"User {u}", "email": f"user{u}@bench.example", "mobile": "9000000000",
+             "password": "x", "address": "Bench street 1"}
+            for u in range(1, user_count + 1)
+        ])
+        insert_chunked(connection, DeliveryPartner, [
+            {"id": p, "name": f"Partner {p}", "email": f"partner{p}@bench.example",
+             "mobile": f"7{p:09d}", "password": "x", "is_available": True}
+            for p in range(1, partner_count + 1)
+        ])
+
+        # Finished order history, generated chunk by chunk to bound memory
+        for start in range(1, order_count + 1, SEED_CHUNK):
+            orders, items = [], []
+            for order_id in range(start, min(start + SEED_CHUNK, order_count + 1)):
+                restaurant_id = rng.randint(1, restaurant_count)
+                total = 0.0
+                for _ in range(ITEMS_PER_ORDER):
+                    menu_id = (restaurant_id - 1) * MENUS_PER_RESTAURANT + rng.randint(1, MENUS_PER_RESTAURANT)
+                    items.append({"order_id": order_id, "menu_id": menu_id, "quantity": 1, "price": 100.0})
+                    total += 100.0
+                orders.append({
+                    "id": order_id, "user_id": rng.randint(1, user_count), "restaurant_id": restaurant_id,
+                    "delivery_partner_id": rng.randint(1, partner_count), "total_amount": total,
+                    "status": rng.choice(HISTORICAL_STATUSES).name,
+                    "created_at": now - timedelta(minutes=rng.randint(1, 525_600)),
+                })
+            connection.execute(insert(Order), orders)
+            connection.execute(insert(OrderItem), items)
+
+    with Session(engine) as session:
+        backfill_order_summaries(session)
+
+    return {"restaurants": restaurant_count, "partners": partner_count, "orders": order_count,
+            "menus": menu_count, "users": user_count}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.failures = defaultdict(int)
+
+    async def call(self, label: str, request):
+        start = time.perf_counter()
+        response = await request
+        self.samples[label].append((time.perf_counter() - start) * 1000)
+        body = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
+        if response.status_code >= 400 or (isinstance(body, dict) and body.get("status") == "error"):
+            self.failures[label] += 1
+        return body
+
+
+async def virtual_user(client, recorder: Recorder, vu: int, iterations: int, dataset: dict):
+    rng = random.Random(vu)
+    # Each virtual user owns one partner, so assignments never contend for the same row
+    partner_id = vu + 1
+    for i in range(iterations):
+        email = f"vu{vu}_{i}@load.example"
+        await recorder.call("POST /users/register", client.post("/users/register", data={
+            "name": f"VU {vu}", "email": email, "mobile": "9876543210", "address": "Load street 1",
+            "password": PASSWORD, "role": "user"}))
+        login = await recorder.call("POST /users/login", client.post("/users/login", data={
+            "email": email, "password": PASSWORD, "role": "user"}))
+        user_id = login.get("user", {}).get("id") or rng.randint(1, dataset["users"])
+
+        restaurant_id = rng.randint(1, dataset["restaurants"])
+        await recorder.call("GET /menu/{restaurant_id}", client.get(f"/menu/{restaurant_id}"))
+        await recorder.call("GET /menu/dashboard/search", client.get(
+            "/menu/dashboard/search", params={"word_search": rng.choice(SEARCHES)}))
+
+        first_menu = (restaurant_id - 1) * MENUS_PER_RESTAURANT + 1
+        items = [{"menu_id": first_menu + rng.randrange(MENUS_PER_RESTAURANT), "quantity": rng.randint(1, 3)}
+                 for _ in range(rng.randint(1, 4))]
+        created = await recorder.call("POST /orders/create", client.post("/orders/create", data={
+            "user_id": user_id, "restaurant_id": restaurant_id, "items": json.dumps(items)}))
+        order_id = (created.get("order") or {}).get("id") or created.get("order_id")
+        if not order_id:
+            continue
+
+        await recorder.call("PUT /orders/{order_id}/status", client.put(
+            f"/orders/{order_id}/status", params={"status": "PREPARING", "expected_status": "PLACED"}))
+        await recorder.call("POST /orders/{order_id}/assign/{partner_id}",
+                            client.post(f"/orders/{order_id}/assign/{partner_id}"))
+        await recorder.call("PUT /orders/{order_id}/status", client.put(
+            f"/orders/{order_id}/status", params={"status": "DELIVERED", "expected_status": "OUT_FOR_DELIVERY"}))
+
+        await recorder.call("GET /orders/user/{user_id}/orders",
+                            client.get(f"/orders/user/{rng.randint(1, dataset['users'])}/orders"))
+        await recorder.call("GET /orders/restaurant/{restaurant_id}",
+                            client.get(f"/orders/restaurant/{restaurant_id}"))
+
+
+async def run(virtual_users: int, iterations: int, dataset: dict):
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            virtual_user(client, recorder, vu, iterations, dataset) for vu in range(virtual_users)
+        ])
+        elapsed = time.perf_counter() - start
+    return recorder, elapsed
+
+
+def report(recorder: Recorder, elapsed: float):
+    print(f"{'endpoint':<44} {'n':>6} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8}")
+    total = 0
+    for label, samples in sorted(recorder.samples.items()):
+        stats = summarize(samples)
+        total += len(samples)
+        print(f"{label:<44} {len(samples):>6} {recorder.failures[label]:>5} "
+              f"{stats['p50']:>7.2f}ms {stats['p95']:>7.2f}ms {stats['p99']:>7.2f}ms "
+              f"{len(samples) / elapsed:>8.1f}")
+    print(f"{total} requests in {elapsed:.1f}s -> {total / elapsed:.1f} req/s overall")
+
+
+async def main(scale: int, virtual_users: int, iterations: int):
+    create_db_and_tables()
+    start = time.perf_counter()
+    dataset = seed(scale)
+    print(f"seeded {dataset} in {time.perf_counter() - start:.1f}s")
+    if virtual_users > dataset["partners"]:
+        raise SystemExit("virtual_users must not exceed the number of seeded partners")
+
+    recorder, elapsed = await run(virtual_users, iterations, dataset)
+    report(recorder, elapsed)
+
+    image_variants.shutdown()
+    await dispose_engines()
+    if sum(recorder.failures.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # Request logs would dominate the run time
+    logging.disable(logging.INFO)
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 10,
+    ))
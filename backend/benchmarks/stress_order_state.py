@@ -0,0 +1,126 @@
+"""
+Concurrency stress test for crud.order_state.transition_order.
+
+Many threads push the same orders through random transitions at once, each
+with its own session, as concurrent dashboard clicks would. Afterwards every
+order's successful transitions must form one valid chain ending in its stored
+status: no lost updates, no backwards moves, partners freed exactly once.
+
+    cd backend && python -m benchmarks.stress_order_state [threads] [orders] [attempts]
+"""
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from benchmarks.bench_menu import seed_restaurant
+from benchmarks.common import temp_database_url, make_engines
+from crud.order_state import transition_order, can_transition
+from database.models import DeliveryPartner, Order, OrderStatus, User
+
+TARGETS = [
+    OrderStatus.PREPARING,
+    OrderStatus.OUT_FOR_DELIVERY,
+    OrderStatus.DELIVERED,
+    OrderStatus.CANCELLED,
+]
+
+
+def seed_orders(engine, order_count: int):
+    restaurant_id = seed_restaurant(engine, 1, 1)
+    with Session(engine) as session:
+        user = User(name="Stress", email="stress@example.com", mobile="9000000000",
+                    password="x", address="Stress street 1")
+        session.add(user)
+        session.flush()
+        partners = [
+            DeliveryPartner(name=f"P{i}", email=f"p{i}@example.com", mobile=f"80000{i:05d}",
+                            password="x", is_available=False)
+            for i in range(order_count)
+        ]
+        session.add_all(partners)
+        session.flush()
+        # One busy partner per order, so DELIVERED / CANCELLED must free exactly that partner
+        session.execute(insert(Order), [
+            {"user_id": user.id, "restaurant_id": restaurant_id, "status": OrderStatus.PLACED,
+             "total_amount": 10.0, "delivery_partner_id": partner.id}
+            for partner in partners
+        ])
+        session.commit()
+        return session.exec(select(Order.id)).all()
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    order_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    attempts = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    engine, _ = make_engines(temp_database_url("stress"))
+    order_ids = seed_orders(engine, order_count)
+
+    lock = threading.Lock()
+    applied = defaultdict(list)  # order_id -> [(from, to)] of successful transitions
+    outcomes = defaultdict(int)
+    errors = []
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        for _ in range(attempts):
+            order_id = rng.choice(order_ids)
+            try:
+                with Session(engine) as session:
+                    result = transition_order(session, order_id, rng.choice(TARGETS))
+            except Exception as e:
+                errors.append(repr(e))
+                continue
+            with lock:
+                outcomes["ok" if result.ok else result.reason] += 1
+                if result.ok:
+                    applied[order_id].append((result.from_status, result.to_status))
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    problems = list(errors)
+    with Session(engine) as session:
+        orders = {order.id: order for order in session.exec(select(Order)).all()}
+        partners = {partner.id: partner for partner in session.exec(select(DeliveryPartner)).all()}
+
+    for order_id in order_ids:
+        status = OrderStatus.PLACED
+        for from_status, to_status in applied[order_id]:
+            if from_status != status or not can_transition(from_status, to_status):
+                problems.append(f"order {order_id}: {from_status} -> {to_status} after {status}")
+            status = to_status
+        order = orders[order_id]
+        if OrderStatus(order.status) != status:
+            problems.append(f"order {order_id}: stored {order.status}, expected {status}")
+        freed = status in (OrderStatus.DELIVERED, OrderStatus.CANCELLED)
+        if partners[order.delivery_partner_id].is_available != freed:
+            problems.append(f"order {order_id}: partner availability does not match {status}")
+
+    total = threads * attempts
+    print(f"{threads} threads x {attempts} attempts on {order_count} orders in {elapsed:.2f}s "
+          f"({total / elapsed:.0f} transitions/s)")
+    print(" ".join(f"{name}={count}" for name, count in sorted(outcomes.items())), f"errors={len(errors)}")
+    if not outcomes["ok"]:
+        problems.append("no transition succeeded")
+    if problems:
+        print(f"FAILED: {len(problems)} problems")
+        for problem in problems[:20]:
+            print("  ", problem)
+        sys.exit(1)
+    print("OK: every order followed a valid chain of transitions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from typing import Optional, List
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.models import Order, OrderItem, Menu, User, Restaurant, OrderStatus
+from crud.pagination import keyset_page, split_page, DEFAULT_PAGE_SIZE
+
+BOARD_STATUSES = [OrderStatus.PREPARING, OrderStatus.OUT_FOR_DELIVERY]
+
+
+async def get_delivery_board(
+    session: AsyncSession,
+    statuses: List[OrderStatus] = BOARD_STATUSES,
+    partner_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+):
+    """
+    Deliverable orders across all restaurants, newest first.
+    Two column-only queries (orders page, then its items); no ORM entities.
+    Returns (order rows, {order_id: [item rows]}, next cursor).
+    """
+    stmt = (
+        select(
+            Order.id, Order.status, Order.total_amount, Order.created_at,
+            Order.delivery_partner_id, Order.restaurant_id, Order.user_id,
+            Restaurant.name.label("restaurant_name"),
+            Restaurant.address.label("restaurant_address"),
+            User.name.label("user_name"),
+            User.address.label("user_address"),
+            User.mobile.label("user_mobile")
+        )
+        .join(Restaurant, Restaurant.id == Order.restaurant_id)
+        .outerjoin(User, User.id == Order.user_id)
+        .where(Order.status.in_(statuses))
+    )
+    if partner_id is not None:
+        stmt = stmt.where(Order.delivery_partner_id == partner_id)
+
+    result = await session.exec(keyset_page(stmt, Order.created_at, Order.id, cursor, limit))
+    orders, next_cursor = split_page(result.all(), limit)
+
+    items_by_order = {order.id: [] for order in orders}
+    if items_by_order:
+        item_rows = await session.exec(
+            select(
+                OrderItem.order_id, OrderItem.menu_id, OrderItem.quantity,
+                Menu.name, Menu.menu_item_pic
+            )
+            .join(Menu, Menu.id == OrderItem.menu_id)
+            .where(OrderItem.order_id.in_(list(items_by_order)))
+            .order_by(OrderItem.id)
+        )
+        for item in item_rows:
+            items_by_order[item.order_id].append(item)
+
+    return orders, items_by_order, next_cursor
@@ -0,0 +1,114 @@
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.models import Menu, Category, Restaurant
+from database.search_index import (
+    is_search_index_enabled,
+    to_fts_query,
+    restaurant_search_subquery
+)
+from crud.menu_crud import (
+    build_search_candidates,
+    build_menu_details,
+    order_by_ids
+)
+from services.image_variants import image_urls
+
+SEARCH_RESULT_LIMIT = 50
+
+
+def group_menu_rows(rows) -> dict:
+    """
+    Buckets (category..., menu...) rows ordered by category into the
+    {category_name: {..., "items": [...]}} menu shape in a single pass
+    """
+    menu_by_category = {}
+    current_category_id = None
+    items = None
+    for (category_id, category_name, start_time, end_time,
+         item_id, item_name, price, is_available, menu_item_pic) in rows:
+        if category_id != current_category_id:
+            current_category_id = category_id
+            items = []
+            menu_by_category[category_name] = {
+                "category_id": category_id,
+                "start_time": str(start_time) if start_time else None,
+                "end_time": str(end_time) if end_time else None,
+                "items": items
+            }
+        items.append({
+            "id": item_id,
+            "name": item_name,
+            "price": price,
+            "is_available": is_available,
+            "menu_item_pic": menu_item_pic,
+            "menu_item_images": image_urls(menu_item_pic)
+        })
+    return menu_by_category
+
+
+async def get_restaurant_menu_grouped(
+    session: AsyncSession,
+    restaurant_id: int,
+    category_id: int = None
+) -> dict:
+    """Restaurant menu grouped by category, from one query ordered by category"""
+    stmt = (
+        select(
+            Category.id, Category.name, Category.start_time, Category.end_time,
+            Menu.id, Menu.name, Menu.price, Menu.is_available, Menu.menu_item_pic
+        )
+        .join(Menu, Menu.category_id == Category.id)
+        .where(
+            Category.restaurant_id == restaurant_id,
+            Menu.restaurant_id == restaurant_id
+        )
+        .order_by(Category.id, Menu.id)
+    )
+    if category_id:
+        stmt = stmt.where(Menu.category_id == category_id)
+    result = await session.exec(stmt)
+    return group_menu_rows(result)
+
+
+async def get_all_restaurants(session: AsyncSession):
+    result = await session.exec(select(Restaurant))
+    return result.all()
+
+
+async def search_restaurants(session: AsyncSession, keyword: str, limit: int = SEARCH_RESULT_LIMIT):
+    if is_search_index_enabled():
+        if not to_fts_query(keyword):
+            return []
+        fts = restaurant_search_subquery(keyword)
+        stmt = (
+            select(Restaurant)
+            .join(fts, fts.c.restaurant_id == Restaurant.id)
+            .order_by(fts.c.rank)
+            .limit(limit)
+        )
+    else:
+        stmt = select(Restaurant).where(Restaurant.name.ilike(f"%{keyword}%")).limit(limit)
+    result = await session.exec(stmt)
+    return result.all()
+
+
+async def search_dashboard_menu(
+    session: AsyncSession,
+    keyword: str,
+    available_only: bool = True,
+    limit: int = SEARCH_RESULT_LIMIT
+):
+    """
+    Menus whose name or restaurant name match the keyword, best match first,
+    limited to categories open right now. Uses the FTS5 prefix index when
+    present, otherwise an ILIKE scan. Only returned menus are loaded as ORM objects.
+    """
+    candidates = build_search_candidates(keyword, available_only, limit)
+    if candidates is None:
+        return []
+    result = await session.exec(candidates)
+    menu_ids = result.all()
+    if not menu_ids:
+        return []
+    result = await session.exec(build_menu_details(menu_ids))
+    return order_by_ids(result.all(), menu_ids)
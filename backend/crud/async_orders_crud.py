@@ -0,0 +1,30 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import selectinload
+from database.models import Order, OrderItem, OrderStatus
+from crud.orders_crud import build_orders_page_stmt
+from crud.pagination import split_page, DEFAULT_PAGE_SIZE
+
+
+async def get_user_orders_with_items(
+    session: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    status: Optional[OrderStatus] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+):
+    """
+    One page of a user's order history with restaurant and item menus loaded
+    up front (no lazy IO). Returns (orders, next cursor).
+    """
+    stmt = build_orders_page_stmt(
+        Order.user_id, user_id, cursor, limit, status, from_date, to_date
+    ).options(
+        selectinload(Order.restaurant),
+        selectinload(Order.items).selectinload(OrderItem.menu)
+    )
+    result = await session.exec(stmt)
+    return split_page(result.all(), limit)
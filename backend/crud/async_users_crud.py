@@ -0,0 +1,34 @@
+from typing import Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.models import User, Restaurant, DeliveryPartner
+from services.passwords import password_hasher
+
+ACCOUNT_MODELS = {
+    "user": User,
+    "restaurant": Restaurant,
+    "delivery_person": DeliveryPartner
+}
+
+
+async def authenticate_account(session: AsyncSession, email: str, password: str, role: str = "user"):
+    """
+    Account for email/password in the role's table, or None.
+
+    The hash check runs on the password pool, not the event loop. A legacy
+    plain-text or outdated hash is replaced after a successful login.
+    Raises PasswordHasherBusy when the pool's queue is full.
+    """
+    model = ACCOUNT_MODELS.get(role, User)
+    result = await session.exec(select(model).where(model.email == email))
+    account: Optional[object] = result.first()
+
+    matches, new_hash = await password_hasher.verify(password, account.password if account else None)
+    if not account or not matches:
+        return None
+
+    if new_hash:
+        account.password = new_hash
+        session.add(account)
+        await session.commit()
+    return account
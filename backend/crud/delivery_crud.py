@@ -1,8 +1,22 @@
-from typing import Optional
+from typing import List, Optional
 from sqlmodel import Session, select
+from sqlalchemy import update
 from sqlalchemy.orm import selectinload
-from database.models import DeliveryPartner, Order, User, Restaurant
+from database.models import DeliveryPartner, Order, OrderStatus, User, Restaurant
 from crud.orders_crud import update_order_status
+from crud.order_summaries import update_order_summary, event_snapshots
+from services.order_events import publish_order_event
+from services.partner_index import partner_index
+from services.passwords import password_hasher
+
+# Orders a partner can be assigned to: accepted by the restaurant and not yet out.
+# Kept explicit so a new transition never widens what dispatch hands out.
+ASSIGNABLE_STATUSES = (OrderStatus.PREPARING,)
+
+# claim_order_for_partner outcomes
+CLAIM_ASSIGNED = "assigned"
+CLAIM_PARTNER_UNAVAILABLE = "partner_unavailable"
+CLAIM_ORDER_UNAVAILABLE = "order_unavailable"
 
 def check_delivery_partner_exists(session: Session, email: str) -> bool:
     try:
@@ -18,7 +32,7 @@ def create_delivery_partner(session: Session, data: dict) -> DeliveryPartner:
         name=data["name"],
         email=data["email"],
         mobile=data["mobile"],
-        password=data["password"],
+        password=password_hasher.hash_sync(data["password"]),
         address=data.get("address", "N/A"),  # Match model default
         vehicle=data.get("vehicle", "Bike"),  # Match model default
         delivery_person_profile=data.get("delivery_person_profile"),  # Use correct field name
@@ -27,6 +41,7 @@ def create_delivery_partner(session: Session, data: dict) -> DeliveryPartner:
     session.add(partner)
     session.commit()
     session.refresh(partner)
+    partner_index.mark_available(partner.id)
     return partner
 
 def get_delivery_partner(session: Session, partner_id: int) -> Optional[DeliveryPartner]:
@@ -34,15 +49,17 @@ def get_delivery_partner(session: Session, partner_id: int) -> Optional[Delivery
 
 def verify_delivery_partner(session: Session, email: str, password: str):
     try:
-        partner = session.exec(
-            select(DeliveryPartner).where(
-                DeliveryPartner.email == email, 
-                DeliveryPartner.password == password
-            )
-        ).first()
-        
+        partner = session.exec(select(DeliveryPartner).where(DeliveryPartner.email == email)).first()
         if not partner:
             return False, {}
+
+        matches, new_hash = password_hasher.verify_sync(password, partner.password)
+        if not matches:
+            return False, {}
+        if new_hash:
+            partner.password = new_hash
+            session.commit()
+            session.refresh(partner)
         return True, partner
     except Exception as e:
         print(f"Error verifying delivery partner: {e}")
@@ -54,12 +71,16 @@ def update_delivery_partner(session: Session, partner_id: int, data: dict) -> Op
     if not partner:
         return None
 
+    if data.get("password"):
+        data = {**data, "password": password_hasher.hash_sync(data["password"])}
     for key, value in data.items():
         if hasattr(partner, key):
             setattr(partner, key, value)
 
     session.commit()
     session.refresh(partner)
+    if "is_available" in data:
+        partner_index.invalidate()
     return partner
 
 def delete_delivery_partner(session: Session, partner_id: int) -> bool:
@@ -70,28 +91,70 @@ def delete_delivery_partner(session: Session, partner_id: int) -> bool:
 
     session.delete(partner)
     session.commit()
+    partner_index.remove(partner_id)
     return True
 
+def claim_order_for_partner(session: Session, order_id: int, partner_id: int) -> str:
+    """
+    Atomically give an unassigned order to a free partner.
+
+    Both rows are changed with conditional UPDATEs in one transaction, so two
+    workers can never hand the same partner (or order) out twice: whoever
+    loses the race sees rowcount 0 and rolls back.
+    """
+    claimed = session.execute(
+        update(DeliveryPartner)
+        .where(DeliveryPartner.id == partner_id, DeliveryPartner.is_available == True)
+        .values(is_available=False)
+    ).rowcount
+    if not claimed:
+        session.rollback()
+        return CLAIM_PARTNER_UNAVAILABLE
+
+    assigned = session.execute(
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.delivery_partner_id.is_(None),
+            Order.status.in_(ASSIGNABLE_STATUSES)
+        )
+        .values(delivery_partner_id=partner_id, status=OrderStatus.OUT_FOR_DELIVERY)
+    ).rowcount
+    if not assigned:
+        session.rollback()
+        return CLAIM_ORDER_UNAVAILABLE
+
+    update_order_summary(session, order_id, delivery_partner_id=partner_id, status=OrderStatus.OUT_FOR_DELIVERY)
+    session.commit()
+    partner_index.mark_assigned(partner_id)
+    return CLAIM_ASSIGNED
+
 def assign_delivery_partner(
     session: Session,
     order_id: int,
     partner_id: int
 ) -> Optional[Order]:
     """Assign delivery partner to an order"""
-    order = session.get(Order, order_id)
-    partner = session.get(DeliveryPartner, partner_id)
-
-    if not order or not partner or not partner.is_available:
+    outcome = claim_order_for_partner(session, order_id, partner_id)
+    if outcome == CLAIM_PARTNER_UNAVAILABLE:
+        partner_index.mark_busy(partner_id)
+    if outcome != CLAIM_ASSIGNED:
         return None
 
-    order.delivery_partner_id = partner.id
-    order.status = "OUT_FOR_DELIVERY"
-    partner.is_available = False
-
-    session.commit()
-    session.refresh(order)
+    order = session.get(Order, order_id)
+    publish_order_event(order, "order_assigned", event_snapshots(session, [order_id]).get(order_id))
     return order
 
+def get_dispatchable_order_ids(session: Session, limit: int) -> List[int]:
+    """Oldest unassigned orders that are waiting for a partner"""
+    stmt = (
+        select(Order.id)
+        .where(Order.delivery_partner_id.is_(None), Order.status.in_(ASSIGNABLE_STATUSES))
+        .order_by(Order.created_at, Order.id)
+        .limit(limit)
+    )
+    return session.exec(stmt).all()
+
 def get_partner_orders(session: Session, partner_id: int):
     """Get all orders assigned to a delivery partner"""
     stmt = (
@@ -102,14 +165,8 @@ def get_partner_orders(session: Session, partner_id: int):
     return session.exec(stmt).first()
 
 def mark_delivered(session: Session, order_id: int) -> Optional[Order]:
-    order = update_order_status(session, order_id, "DELIVERED")
-
-    if order and order.delivery_partner:
-        order.delivery_partner.is_available = True
-        session.commit()
-        session.refresh(order.delivery_partner)
-
-    return order
+    # The transition frees the partner in the same transaction
+    return update_order_status(session, order_id, "DELIVERED")
 
 def get_all_delivery_partners(session: Session):
     """Get all delivery partners"""
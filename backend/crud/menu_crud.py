@@ -1,9 +1,13 @@
 from sqlmodel import Session, select
-from typing import List, Optional
+from typing import List, Optional, Iterable
+from sqlalchemy import insert
 from database.models import Menu,Category, Restaurant
 from datetime import datetime
 from utils import get_current_ist_time
 from sqlalchemy.orm import selectinload, joinedload
+from database.search_index import is_search_index_enabled, to_fts_query, menu_search_subquery
+from services.menu_cache import menu_cache
+from services.category_schedule import category_open_clause, is_time_in_window, current_minute
 def create_menu_item(session: Session, data: dict) -> Menu:
     menu = Menu(
         name=data["name"],
@@ -16,25 +20,107 @@ def create_menu_item(session: Session, data: dict) -> Menu:
     session.add(menu)
     session.commit()
     session.refresh(menu)
+    menu_cache.invalidate(menu.restaurant_id)
     return menu
 
+MENU_IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_IMPORT_ERRORS = 100
+
+
+def parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    if value is None or str(value).strip() == "":
+        return True
+    text_value = str(value).strip().lower()
+    if text_value in ("true", "1", "yes", "y"):
+        return True
+    if text_value in ("false", "0", "no", "n"):
+        return False
+    raise ValueError(f"invalid is_available value '{value}'")
+
+
+def parse_menu_import_row(item: dict, restaurant_id: int, category_ids: set, category_by_name: dict) -> dict:
+    """Validate one import row (category given by category_id or category name)"""
+    name = str(item.get("name") or "").strip()
+    if not name:
+        raise ValueError("name is required")
+
+    try:
+        price = float(item.get("price"))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid price '{item.get('price')}'")
+    if price < 0:
+        raise ValueError("price must not be negative")
+
+    if item.get("category_id") not in (None, ""):
+        try:
+            category_id = int(item["category_id"])
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid category_id '{item['category_id']}'")
+        if category_id not in category_ids:
+            raise ValueError(f"category {category_id} does not belong to this restaurant")
+    elif item.get("category"):
+        category_id = category_by_name.get(str(item["category"]).strip().lower())
+        if category_id is None:
+            raise ValueError(f"unknown category '{item['category']}'")
+    else:
+        raise ValueError("category_id or category is required")
+
+    return {
+        "name": name,
+        "price": price,
+        "restaurant_id": restaurant_id,
+        "category_id": category_id,
+        "is_available": parse_bool(item.get("is_available")),
+        "menu_item_pic": item.get("menu_item_pic") or None
+    }
+
+
 def create_multiple_menu_items(
     session: Session,
     restaurant_id: int,
-    items: List[dict]
-) -> List[Menu]:
-    menus = [
-        Menu(
-            restaurant_id=restaurant_id,
-            name=item["name"],
-            price=item["price"],
-            is_available=item.get("is_available", True)
-        )
-        for item in items
-    ]
-    session.add_all(menus)
+    items: Iterable[dict],
+    chunk_size: int = MENU_IMPORT_CHUNK_SIZE
+) -> dict:
+    """
+    Bulk menu import. `items` may be any iterable (e.g. a CSV reader) and is
+    consumed row by row; valid rows are inserted in chunks within one
+    transaction, invalid rows are skipped and reported.
+    """
+    categories = session.exec(
+        select(Category.id, Category.name).where(Category.restaurant_id == restaurant_id)
+    ).all()
+    category_ids = {category_id for category_id, _ in categories}
+    category_by_name = {name.lower(): category_id for category_id, name in categories}
+
+    created = 0
+    failed = 0
+    errors = []
+    chunk = []
+    for row_number, item in enumerate(items, start=1):
+        try:
+            chunk.append(parse_menu_import_row(item, restaurant_id, category_ids, category_by_name))
+        except ValueError as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                errors.append({"row": row_number, "message": str(e)})
+            continue
+
+        if len(chunk) >= chunk_size:
+            session.execute(insert(Menu), chunk)
+            created += len(chunk)
+            chunk = []
+
+    if chunk:
+        session.execute(insert(Menu), chunk)
+        created += len(chunk)
+
     session.commit()
-    return menus
+    if created:
+        menu_cache.invalidate(restaurant_id)
+    return {"created": created, "failed": failed, "errors": errors}
+
 def get_restaurant_menu(
     session: Session,
     restaurant_id: int,
@@ -64,6 +150,7 @@ def update_menu_item(
 
     session.commit()
     session.refresh(menu)
+    menu_cache.invalidate(menu.restaurant_id)
     return menu
 def delete_menu_item(session: Session, menu_id: int) -> bool:
     menu = session.get(Menu, menu_id)
@@ -71,10 +158,10 @@ def delete_menu_item(session: Session, menu_id: int) -> bool:
         return False
     session.delete(menu)
     session.commit()
+    menu_cache.invalidate(menu.restaurant_id)
     return True
-def is_category_available(category) -> bool:
-    now = datetime.now().time()
-    return category.start_time <= now <= category.end_time
+def is_category_available(category, now=None) -> bool:
+    return is_time_in_window(category.start_time, category.end_time, now or current_minute())
 
 def get_menu(session: Session, menu_id: int):
     return session.get(Menu, menu_id)
@@ -96,6 +183,7 @@ def update_menu(session: Session, menu_id: int, data: dict):
         setattr(menu, key, value)
     session.commit()
     session.refresh(menu)
+    menu_cache.invalidate(menu.restaurant_id)
     return menu
 def delete_menu(session: Session, menu_id: int):
     menu = session.get(Menu, menu_id)
@@ -103,36 +191,63 @@ def delete_menu(session: Session, menu_id: int):
         return False
     session.delete(menu)
     session.commit()
+    menu_cache.invalidate(menu.restaurant_id)
     return True
   
-def search_dashboard_menu(
-    session: Session,
-    keyword: str,
-    available_only: bool = True
-):
+def build_search_candidates(keyword: str, available_only: bool = True, limit: int = 50):
+    """
+    Ids of menus matching the keyword in categories open right now, best match first.
+    Returns None when the keyword has nothing searchable in it.
+    """
     stmt = (
+        select(Menu.id)
+        .join(Category, Category.id == Menu.category_id)
+        .where(category_open_clause(current_minute()))
+    )
+    if is_search_index_enabled():
+        if not to_fts_query(keyword):
+            return None
+        fts = menu_search_subquery(keyword)
+        stmt = stmt.join(fts, fts.c.menu_id == Menu.id).order_by(fts.c.rank)
+    else:
+        stmt = stmt.join(Menu.restaurant).where(
+            Menu.name.ilike(f"%{keyword}%") |
+            Restaurant.name.ilike(f"%{keyword}%")
+        )
+
+    if available_only:
+        stmt = stmt.where(Menu.is_available == True)
+    return stmt.limit(limit)
+
+
+def build_menu_details(menu_ids: list):
+    return (
         select(Menu)
-        .join(Menu.restaurant)   
-        .join(Menu.category)     
+        .where(Menu.id.in_(menu_ids))
         .options(
             joinedload(Menu.restaurant),
             joinedload(Menu.category)
         )
-        .where(
-            Menu.name.ilike(f"%{keyword}%") |
-            Restaurant.name.ilike(f"%{keyword}%")
-        )
     )
 
-    if available_only:
-        stmt = stmt.where(Menu.is_available == True)
-    stmt = stmt.distinct(Menu.id)
-    menus = session.exec(stmt).all()
-    current_time = datetime.now().time()
-    filtered_menus = []
-    for menu in menus:
-        category = menu.category
-        if category.start_time <= current_time <= category.end_time:
-            filtered_menus.append(menu)
-
-    return filtered_menus
+
+def order_by_ids(menus, menu_ids: list) -> list:
+    by_id = {menu.id: menu for menu in menus}
+    return [by_id[menu_id] for menu_id in menu_ids if menu_id in by_id]
+
+
+def search_dashboard_menu(
+    session: Session,
+    keyword: str,
+    available_only: bool = True,
+    limit: int = 50
+):
+    # Only the menus we return are loaded as ORM objects
+    candidates = build_search_candidates(keyword, available_only, limit)
+    if candidates is None:
+        return []
+    menu_ids = session.exec(candidates).all()
+    if not menu_ids:
+        return []
+    menus = session.exec(build_menu_details(menu_ids)).all()
+    return order_by_ids(menus, menu_ids)
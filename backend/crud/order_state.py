@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from database.models import Order, OrderStatus, DeliveryPartner
+from services.order_events import publish_order_event
+from services.partner_index import partner_index
+from crud.order_summaries import update_order_summary
+
+# Allowed moves; DELIVERED and CANCELLED are final
+ORDER_TRANSITIONS = {
+    OrderStatus.PLACED: {OrderStatus.PREPARING, OrderStatus.CANCELLED},
+    OrderStatus.PREPARING: {OrderStatus.OUT_FOR_DELIVERY, OrderStatus.CANCELLED},
+    OrderStatus.OUT_FOR_DELIVERY: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+# Statuses after which the assigned partner is free again
+RELEASES_PARTNER = {OrderStatus.DELIVERED, OrderStatus.CANCELLED}
+
+# TransitionResult.reason values
+NOT_FOUND = "not_found"
+INVALID_STATUS = "invalid_status"
+INVALID_TRANSITION = "invalid_transition"
+CONFLICT = "conflict"
+
+
+@dataclass
+class TransitionResult:
+    ok: bool
+    order_id: int
+    to_status: Optional[OrderStatus] = None
+    from_status: Optional[OrderStatus] = None
+    current_status: Optional[OrderStatus] = None
+    reason: Optional[str] = None
+    order: Optional[Order] = None
+
+    def message(self) -> str:
+        if self.ok:
+            return f"Order moved from {self.from_status.value} to {self.to_status.value}"
+        if self.reason == NOT_FOUND:
+            return "Order not found"
+        if self.reason == INVALID_STATUS:
+            return f"Unknown status. Use one of: {', '.join(s.value for s in OrderStatus)}"
+        if self.reason == CONFLICT:
+            return f"Order changed to {self.current_status.value} in the meantime"
+        return f"Cannot move order from {self.current_status.value} to {self.to_status.value}"
+
+
+def parse_status(value) -> Optional[OrderStatus]:
+    if isinstance(value, OrderStatus):
+        return value
+    try:
+        return OrderStatus(str(value).upper())
+    except ValueError:
+        return None
+
+
+def can_transition(from_status: OrderStatus, to_status: OrderStatus) -> bool:
+    return to_status in ORDER_TRANSITIONS.get(from_status, set())
+
+
+def transition_order(
+    session: Session,
+    order_id: int,
+    to_status,
+    expected_status=None
+) -> TransitionResult:
+    """
+    Move an order to to_status with a compare-and-swap:
+    UPDATE orders SET status=:to WHERE id=:id AND status=:from.
+
+    `from` is expected_status when the caller saw one (e.g. the dashboard),
+    otherwise the status read just before. If someone else changed the order
+    in between, nothing is written and the result reports the conflict with
+    the order's current status. A partner is released in the same transaction
+    when the order is delivered or cancelled.
+    """
+    target = parse_status(to_status)
+    if target is None:
+        return TransitionResult(False, order_id, reason=INVALID_STATUS)
+
+    row = session.exec(
+        select(Order.status, Order.delivery_partner_id).where(Order.id == order_id)
+    ).first()
+    if row is None:
+        return TransitionResult(False, order_id, target, reason=NOT_FOUND)
+    current, partner_id = OrderStatus(row[0]), row[1]
+
+    source = parse_status(expected_status) if expected_status is not None else current
+    if source is None:
+        return TransitionResult(False, order_id, target, current_status=current, reason=INVALID_STATUS)
+    if source != current:
+        return TransitionResult(False, order_id, target, source, current, CONFLICT)
+    if not can_transition(source, target):
+        return TransitionResult(False, order_id, target, source, current, INVALID_TRANSITION)
+
+    updated = session.execute(
+        update(Order)
+        .where(Order.id == order_id, Order.status == source)
+        .values(status=target)
+    ).rowcount
+    if not updated:
+        session.rollback()
+        latest = session.exec(select(Order.status).where(Order.id == order_id)).first()
+        latest = OrderStatus(latest) if latest is not None else None
+        return TransitionResult(False, order_id, target, source, latest, CONFLICT if latest else NOT_FOUND)
+
+    update_order_summary(session, order_id, status=target)
+
+    if partner_id and target in RELEASES_PARTNER:
+        session.execute(
+            update(DeliveryPartner)
+            .where(DeliveryPartner.id == partner_id)
+            .values(is_available=True)
+        )
+
+    session.commit()
+    if partner_id and target in RELEASES_PARTNER:
+        partner_index.mark_available(partner_id)
+
+    order = session.get(Order, order_id)
+    publish_order_event(order)
+    return TransitionResult(True, order_id, target, source, target, order=order)
@@ -0,0 +1,237 @@
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import insert, update, delete
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from crud.pagination import keyset_page, split_page, DEFAULT_PAGE_SIZE
+from database.models import Order, OrderItem, OrderSummary, OrderStatus, Menu, Restaurant, User
+from logger_config import get_logger
+from services.image_variants import image_url
+from services.order_events import order_events
+
+logger = get_logger("OrderSummaries")
+
+SUMMARY_BACKFILL_CHUNK_SIZE = 1000
+
+# Read model behind the order list pages. Every write path that creates an
+# order or changes its status also writes the order's summary row in the same
+# transaction, so a list page is one indexed scan of order_summaries.
+
+
+def encode_items_digest(lines) -> str:
+    """[(menu_id, name, quantity, pic)] -> compact JSON stored on the summary row"""
+    return json.dumps([list(line) for line in lines], separators=(",", ":"))
+
+
+def decode_items_digest(digest: str) -> List[dict]:
+    return [
+        {"menu_id": menu_id, "menu_item_name": name, "quantity": quantity, "menu_item_pic": pic}
+        for menu_id, name, quantity, pic in json.loads(digest or "[]")
+    ]
+
+
+def build_summary_rows(session: Session, order_ids) -> List[dict]:
+    """Summary rows for the given orders: one query for the orders, one for their items"""
+    order_ids = list(order_ids)
+    if not order_ids:
+        return []
+
+    orders = session.exec(
+        select(
+            Order.id, Order.user_id, Order.restaurant_id, Order.delivery_partner_id,
+            Order.status, Order.total_amount, Order.created_at,
+            Restaurant.name.label("restaurant_name"),
+            Restaurant.address.label("restaurant_address"),
+            User.name.label("user_name")
+        )
+        .outerjoin(Restaurant, Restaurant.id == Order.restaurant_id)
+        .outerjoin(User, User.id == Order.user_id)
+        .where(Order.id.in_(order_ids))
+    ).all()
+
+    lines_by_order = {order.id: [] for order in orders}
+    item_rows = session.exec(
+        select(OrderItem.order_id, OrderItem.menu_id, OrderItem.quantity, Menu.name, Menu.menu_item_pic)
+        .join(Menu, Menu.id == OrderItem.menu_id)
+        .where(OrderItem.order_id.in_(order_ids))
+        .order_by(OrderItem.id)
+    )
+    for item in item_rows:
+        lines_by_order[item.order_id].append((item.menu_id, item.name, item.quantity, item.menu_item_pic))
+
+    rows = []
+    for order in orders:
+        lines = lines_by_order[order.id]
+        rows.append({
+            "order_id": order.id,
+            "user_id": order.user_id,
+            "restaurant_id": order.restaurant_id,
+            "delivery_partner_id": order.delivery_partner_id,
+            "status": order.status,
+            "total_amount": order.total_amount,
+            "created_at": order.created_at,
+            "restaurant_name": order.restaurant_name or "",
+            "restaurant_address": order.restaurant_address or "",
+            "user_name": order.user_name,
+            "item_count": len(lines),
+            "first_item_pic": lines[0][3] if lines else None,
+            "items_digest": encode_items_digest(lines),
+        })
+    return rows
+
+
+def add_order_summaries(session: Session, order_ids) -> int:
+    """Insert summaries for newly created orders, without committing"""
+    rows = build_summary_rows(session, order_ids)
+    if rows:
+        session.execute(insert(OrderSummary), rows)
+    return len(rows)
+
+
+def update_order_summary(session: Session, order_id: int, **values):
+    """Mirror a status / partner change onto the summary row, without committing"""
+    session.execute(update(OrderSummary).where(OrderSummary.order_id == order_id).values(**values))
+
+
+def delete_order_summary(session: Session, order_id: int):
+    session.execute(delete(OrderSummary).where(OrderSummary.order_id == order_id))
+
+
+def sync_restaurant_details(session: Session, restaurant: Restaurant):
+    """Copy a renamed / moved restaurant onto its summaries, without committing"""
+    session.execute(
+        update(OrderSummary)
+        .where(OrderSummary.restaurant_id == restaurant.id)
+        .values(restaurant_name=restaurant.name, restaurant_address=restaurant.address)
+    )
+
+
+def sync_user_name(session: Session, user: User):
+    session.execute(
+        update(OrderSummary)
+        .where(OrderSummary.user_id == user.id)
+        .values(user_name=user.name)
+    )
+
+
+def event_snapshots(session: Session, order_ids) -> dict:
+    """
+    {order_id: order} in the /delivery/board entry shape (a superset of the
+    order list entries) for event payloads, in one query on the read model.
+    Image paths are relative; clients resolve them against the API host.
+    Skipped while nobody is subscribed, since the events would go nowhere.
+    """
+    order_ids = list(order_ids)
+    if not order_ids or not order_events.subscriber_count():
+        return {}
+
+    rows = session.exec(
+        select(OrderSummary, User.address, User.mobile)
+        .outerjoin(User, User.id == OrderSummary.user_id)
+        .where(OrderSummary.order_id.in_(order_ids))
+    ).all()
+
+    snapshots = {}
+    for summary, user_address, user_mobile in rows:
+        items = decode_items_digest(summary.items_digest)
+        for item in items:
+            item["menu_item_pic"] = image_url(item["menu_item_pic"], "thumb")
+        created_at = summary.created_at.isoformat()
+        snapshots[summary.order_id] = {
+            "order_id": summary.order_id,
+            "status": summary.status,
+            "total_amount": summary.total_amount,
+            "created_at": created_at,
+            "date": created_at,
+            "order_image": image_url(summary.first_item_pic, "small"),
+            "delivery_partner_id": summary.delivery_partner_id,
+            "restaurant": {
+                "id": summary.restaurant_id,
+                "name": summary.restaurant_name,
+                "address": summary.restaurant_address
+            },
+            "user": {
+                "id": summary.user_id,
+                "name": summary.user_name or "Guest",
+                "address": user_address,
+                "mobile": user_mobile
+            },
+            "items": items
+        }
+    return snapshots
+
+
+def backfill_order_summaries(session: Session, chunk_size: int = SUMMARY_BACKFILL_CHUNK_SIZE) -> int:
+    """Create summaries for orders that have none (orders placed before the read model existed)"""
+    total = 0
+    while True:
+        missing = session.exec(
+            select(Order.id)
+            .outerjoin(OrderSummary, OrderSummary.order_id == Order.id)
+            .where(OrderSummary.order_id.is_(None))
+            .limit(chunk_size)
+        ).all()
+        if not missing:
+            break
+        added = add_order_summaries(session, missing)
+        session.commit()
+        if not added:
+            break
+        total += added
+    if total:
+        logger.info("Backfilled %d order summaries", total)
+    return total
+
+
+def build_summary_page_stmt(
+    owner_column,
+    owner_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    status: Optional[List[OrderStatus]] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+):
+    """Newest-first page of one user's / restaurant's summaries, served by the (owner, created_at, order_id) indexes"""
+    stmt = select(OrderSummary).where(owner_column == owner_id)
+    if status:
+        stmt = stmt.where(OrderSummary.status.in_(status))
+    if from_date:
+        stmt = stmt.where(OrderSummary.created_at >= from_date)
+    if to_date:
+        stmt = stmt.where(OrderSummary.created_at <= to_date)
+    return keyset_page(stmt, OrderSummary.created_at, OrderSummary.order_id, cursor, limit)
+
+
+async def get_user_order_summaries(
+    session: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    status: Optional[List[OrderStatus]] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+):
+    """(summaries, next cursor) for a user's order history"""
+    result = await session.exec(build_summary_page_stmt(
+        OrderSummary.user_id, user_id, cursor, limit, status, from_date, to_date
+    ))
+    return split_page(result.all(), limit, "order_id")
+
+
+def get_restaurant_order_summaries(
+    session: Session,
+    restaurant_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    status: Optional[List[OrderStatus]] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+):
+    """(summaries, next cursor) for a restaurant's orders"""
+    return split_page(session.exec(build_summary_page_stmt(
+        OrderSummary.restaurant_id, restaurant_id, cursor, limit, status, from_date, to_date
+    )).all(), limit, "order_id")
@@ -1,49 +1,164 @@
 from sqlmodel import Session, select
+from sqlalchemy import insert
 from sqlalchemy.orm import selectinload, joinedload
 from typing import List, Optional
 from database.models import Order, OrderItem, Menu, User, Restaurant,OrderStatus
+from datetime import datetime
+from crud.pagination import keyset_page, split_page, DEFAULT_PAGE_SIZE
+from services.order_events import publish_order_event
+from crud.order_state import transition_order
+from crud.order_summaries import add_order_summaries, delete_order_summary, event_snapshots
+from logger_config import get_logger
 
-def create_order(session, user_id, restaurant_id, items, payment_image=None):
+logger = get_logger("OrdersCRUD")
+
+def load_cart_menus(session: Session, menu_ids) -> dict:
+    """All menus referenced by one or more carts, in a single IN (...) query"""
+    menu_ids = set(menu_ids)
+    if not menu_ids:
+        return {}
+    menus = session.exec(select(Menu).where(Menu.id.in_(menu_ids))).all()
+    return {menu.id: menu for menu in menus}
+
+
+def price_cart(menus_by_id: dict, restaurant_id: int, items):
+    """
+    Validate cart lines against the restaurant's menus and price them in one pass.
+    Returns ([(menu_id, quantity, unit_price)], total) or None if any line is invalid.
+    """
+    lines = []
     total_amount = 0
+    for item in items:
+        menu = menus_by_id.get(int(item["menu_id"]))
+        if not menu or not menu.is_available or menu.restaurant_id != restaurant_id:
+            return None
+
+        quantity = int(item["quantity"])
+        if quantity <= 0:
+            return None
+
+        lines.append((menu.id, quantity, menu.price))
+        total_amount += menu.price * quantity
+
+    if not lines:
+        return None
+    return lines, total_amount
+
 
+def add_order(session: Session, user_id, restaurant_id, lines, total_amount, payment_image=None) -> Order:
+    """Insert an order and its priced lines (bulk INSERT) without committing"""
     order = Order(
         user_id=user_id,
         restaurant_id=restaurant_id,
         status=OrderStatus.PLACED,
-        total_amount=0,
+        total_amount=total_amount,
         payment_image=payment_image
     )
     session.add(order)
     session.flush()  # ensures order.id exists
 
-    for item in items:
-        menu = session.get(Menu, item["menu_id"])
-        if not menu:
-            session.rollback()
-            return None
+    session.execute(insert(OrderItem), [
+        {"order_id": order.id, "menu_id": menu_id, "quantity": quantity, "price": price}
+        for menu_id, quantity, price in lines
+    ])
+    return order
 
-        if not menu.is_available:
-            session.rollback()
-            return None
 
-        quantity = int(item["quantity"])
-        item_total = menu.price * quantity
-        total_amount += item_total
-
-        order_item = OrderItem(
-            order_id=order.id,
-            menu_id=menu.id,
-            quantity=quantity,
-            price=menu.price
-        )
-        session.add(order_item)
+def create_order(session, user_id, restaurant_id, items, payment_image=None):
+    menus_by_id = load_cart_menus(session, (int(item["menu_id"]) for item in items))
+    priced = price_cart(menus_by_id, restaurant_id, items)
+    if not priced:
+        return None
 
-    order.total_amount = total_amount
+    lines, total_amount = priced
+    order = add_order(session, user_id, restaurant_id, lines, total_amount, payment_image)
+    add_order_summaries(session, [order.id])
 
     session.commit()
     session.refresh(order)
+    publish_order_event(order, "order_created", event_snapshots(session, [order.id]).get(order.id))
     return order
 
+BULK_ORDER_CHUNK_SIZE = 200
+
+
+def create_orders_bulk(session: Session, orders: List[dict], chunk_size: int = BULK_ORDER_CHUNK_SIZE) -> List[dict]:
+    """
+    Create many orders ({user_id, restaurant_id, items, payment_image?}) at once.
+
+    Menus for every cart are loaded with one query; valid orders are inserted
+    chunk by chunk, each chunk in its own transaction with one INSERT for the
+    orders and one for their items. An order_created event goes out for each
+    order once its chunk commits. Returns one result dict per input order.
+    """
+    menus_by_id = load_cart_menus(
+        session,
+        (int(item["menu_id"]) for order in orders for item in order["items"])
+    )
+
+    results: List[Optional[dict]] = [None] * len(orders)
+    for start in range(0, len(orders), chunk_size):
+        valid = []
+        for index in range(start, min(start + chunk_size, len(orders))):
+            order = orders[index]
+            priced = price_cart(menus_by_id, order["restaurant_id"], order["items"])
+            if not priced:
+                results[index] = {"index": index, "status": "error", "message": "Invalid or unavailable items"}
+                continue
+            valid.append((index, order, *priced))
+
+        if not valid:
+            continue
+
+        try:
+            created_at = datetime.utcnow()
+            order_ids = session.execute(
+                insert(Order).returning(Order.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "user_id": order["user_id"],
+                        "restaurant_id": order["restaurant_id"],
+                        "status": OrderStatus.PLACED,
+                        "total_amount": total_amount,
+                        "payment_image": order.get("payment_image"),
+                        "created_at": created_at
+                    }
+                    for _, order, _, total_amount in valid
+                ]
+            ).scalars().all()
+
+            session.execute(insert(OrderItem), [
+                {"order_id": order_id, "menu_id": menu_id, "quantity": quantity, "price": price}
+                for order_id, (_, _, lines, _) in zip(order_ids, valid)
+                for menu_id, quantity, price in lines
+            ])
+            add_order_summaries(session, order_ids)
+            session.commit()
+        except Exception as e:
+            logger.error("Bulk order insert failed | orders=%d | error=%s", len(valid), str(e), exc_info=True)
+            session.rollback()
+            for index, _, _, _ in valid:
+                results[index] = {"index": index, "status": "error", "message": "Order insert failed"}
+            continue
+
+        snapshots = event_snapshots(session, order_ids)
+        for order_id, (index, order, _, total_amount) in zip(order_ids, valid):
+            results[index] = {
+                "index": index,
+                "status": "success",
+                "order_id": order_id,
+                "total_amount": total_amount
+            }
+            publish_order_event(Order(
+                id=order_id,
+                user_id=order["user_id"],
+                restaurant_id=order["restaurant_id"],
+                status=OrderStatus.PLACED,
+                total_amount=total_amount
+            ), "order_created", snapshots.get(order_id))
+
+    return results
+
 def get_order_with_details(session: Session, order_id: int):
     stmt = (
         select(Order)
@@ -67,6 +182,44 @@ def get_user_orders(session: Session, user_id: int):
     )
     return session.exec(stmt).all()
 
+def build_orders_page_stmt(
+    owner_column,
+    owner_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    status: Optional[OrderStatus] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+):
+    """Newest-first page of one user's / restaurant's orders, served by the (owner, created_at) indexes"""
+    stmt = select(Order).where(owner_column == owner_id)
+    if status:
+        stmt = stmt.where(Order.status == status)
+    if from_date:
+        stmt = stmt.where(Order.created_at >= from_date)
+    if to_date:
+        stmt = stmt.where(Order.created_at <= to_date)
+    return keyset_page(stmt, Order.created_at, Order.id, cursor, limit)
+
+
+def get_restaurant_orders_page(
+    session: Session,
+    restaurant_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    status: Optional[OrderStatus] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+):
+    """(orders with user and item menus loaded, next cursor)"""
+    stmt = build_orders_page_stmt(
+        Order.restaurant_id, restaurant_id, cursor, limit, status, from_date, to_date
+    ).options(
+        selectinload(Order.user),
+        selectinload(Order.items).selectinload(OrderItem.menu)
+    )
+    return split_page(session.exec(stmt).all(), limit)
+
 def get_all_orders(session: Session):
     stmt = (
         select(Order)
@@ -84,18 +237,15 @@ def delete_order(session: Session, order_id: int):
     if not order:
         return False
 
+    delete_order_summary(session, order_id)
     session.delete(order)
     session.commit()
     return True
 
 def update_order_status(session: Session, order_id: int, status: str):
-    order = session.get(Order, order_id)
-    if not order:
-        return None
-    order.status = status
-    session.commit()
-    session.refresh(order)
-    return order
+    """Validated compare-and-swap status change; None if not found, not allowed or lost a race"""
+    result = transition_order(session, order_id, status)
+    return result.order if result.ok else None
 
 
 def start_preparing(session: Session, order_id: int):
@@ -111,15 +261,8 @@ def complete_order(session: Session, order_id: int):
 
 
 def cancel_order(session: Session, order_id: int):
-    order = session.get(Order, order_id)
-    if not order:
-        return None
-
-    if order.status in ("PLACED", "PREPARING"):
-        order.status = "CANCELLED"
-        session.commit()
-        return order
-    return None
+    # Only PLACED / PREPARING orders can be cancelled (see ORDER_TRANSITIONS)
+    return update_order_status(session, order_id, "CANCELLED")
 
 #order bill 
 def generate_order_bill(session: Session, order_id: int):
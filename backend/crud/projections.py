@@ -0,0 +1,69 @@
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.models import Category, DeliveryPartner, Restaurant, User
+
+# Column-only list queries. Each selects just the fields its response shows,
+# labelled with the response key, so rows go straight to JSON without
+# hydrating ORM entities (and never load password columns).
+
+DELIVERY_PERSON_COLUMNS = (
+    DeliveryPartner.id,
+    DeliveryPartner.name,
+    DeliveryPartner.email,
+    DeliveryPartner.mobile,
+    DeliveryPartner.vehicle,
+    DeliveryPartner.address,
+    DeliveryPartner.delivery_person_profile.label("profile_picture"),
+    DeliveryPartner.is_available,
+    DeliveryPartner.created_at,
+)
+
+USER_COLUMNS = (
+    User.id,
+    User.name,
+    User.email,
+    User.mobile,
+    User.address,
+    User.profile_picture,
+)
+
+CATEGORY_TIMING_COLUMNS = (
+    Category.id,
+    Category.name,
+    Category.start_time,
+    Category.end_time,
+)
+
+RESTAURANT_CARD_COLUMNS = (
+    Restaurant.id.label("restaurant_id"),
+    Restaurant.name,
+    Restaurant.address,
+    Restaurant.restaurant_pic,
+)
+
+
+def rows_to_dicts(rows) -> list:
+    return [row._asdict() for row in rows]
+
+
+async def list_delivery_persons(session: AsyncSession) -> list:
+    result = await session.exec(select(*DELIVERY_PERSON_COLUMNS).order_by(DeliveryPartner.id))
+    return rows_to_dicts(result)
+
+
+def list_users(session: Session) -> list:
+    return rows_to_dicts(session.exec(select(*USER_COLUMNS).order_by(User.id)))
+
+
+def list_category_timings(session: Session, restaurant_id: int) -> list:
+    return rows_to_dicts(session.exec(
+        select(*CATEGORY_TIMING_COLUMNS)
+        .where(Category.restaurant_id == restaurant_id)
+        .order_by(Category.id)
+    ))
+
+
+async def list_restaurant_cards(session: AsyncSession) -> list:
+    result = await session.exec(select(*RESTAURANT_CARD_COLUMNS).order_by(Restaurant.id))
+    return rows_to_dicts(result)
@@ -1,13 +1,15 @@
 from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload
 from database.models import Restaurant
+from services.passwords import password_hasher
+from crud.order_summaries import sync_restaurant_details
 
 
 def create_restaurant(session: Session, data: dict) -> Restaurant:
     restaurant = Restaurant(
         name=data["name"],
         email=data["email"],
-        password=data["password"],
+        password=password_hasher.hash_sync(data["password"]),
         address=data["address"],
         mobile=data["mobile"],
         restaurant_pic=data.get("restaurant_pic")
@@ -19,17 +21,17 @@ def create_restaurant(session: Session, data: dict) -> Restaurant:
 
 
 def verify_restaurant(session: Session, email: str, password: str):
-    print(f" email {email} password {password}")
-    restaurant = session.exec(
-        select(Restaurant).where(
-            Restaurant.email == email,
-            Restaurant.password == password
-        )
-    ).first()
-    print(f"get restaurant {restaurant}")
+    restaurant = session.exec(select(Restaurant).where(Restaurant.email == email)).first()
     if not restaurant:
         return False, None
 
+    matches, new_hash = password_hasher.verify_sync(password, restaurant.password)
+    if not matches:
+        return False, None
+    if new_hash:
+        restaurant.password = new_hash
+        session.commit()
+        session.refresh(restaurant)
     return True, restaurant
 
 
@@ -54,8 +56,12 @@ def update_restaurant(session: Session, restaurant_id: int, data: dict):
     if not restaurant:
         return None
 
+    if data.get("password"):
+        data = {**data, "password": password_hasher.hash_sync(data["password"])}
     for key, value in data.items():
         setattr(restaurant, key, value)
+    if "name" in data or "address" in data:
+        sync_restaurant_details(session, restaurant)
 
     session.commit()
     session.refresh(restaurant)
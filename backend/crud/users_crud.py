@@ -1,6 +1,8 @@
 from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload
 from database.models import User,Restaurant,DeliveryPartner
+from services.passwords import password_hasher
+from crud.order_summaries import sync_restaurant_details, sync_user_name
 def check_user_exists(session: Session, email: str, role: str):
     if role == 'user':
         model = User
@@ -18,12 +20,13 @@ def check_user_exists(session: Session, email: str, role: str):
 def create_user(session: Session, data: dict, role:str) -> User:
 
 #    role = data.get("role", "user")
+   password = password_hasher.hash_sync(data["password"])
    if role == "restaurant":
         new_entry = Restaurant(
             name=data["name"],
             email=data["email"],
             mobile=data["mobile"],
-            password=data["password"],
+            password=password,
             address=data["address"],
             restaurant_pic=data.get("profile_picture")
         )
@@ -32,7 +35,7 @@ def create_user(session: Session, data: dict, role:str) -> User:
             name=data["name"],
             email=data["email"],
             mobile=data["mobile"],
-            password=data["password"],
+            password=password,
             address=data["address"],
             delivery_person_profile=data.get("profile_picture")
         )
@@ -41,7 +44,7 @@ def create_user(session: Session, data: dict, role:str) -> User:
             name=data["name"],
             email=data["email"],
             mobile=data["mobile"],
-            password=data["password"],
+            password=password,
             address=data["address"],
             profile_picture=data.get("profile_picture")
         )
@@ -68,15 +71,18 @@ def verify_user(session: Session, email: str, password: str, role: str):
 
     try:
         # SEARCH ONLY THE TARGET TABLE
-        user = session.exec(
-            select(target_model).where(
-                target_model.email == email, 
-                target_model.password == password
-            )
-        ).first()
-        
+        user = session.exec(select(target_model).where(target_model.email == email)).first()
         if not user:
             return False, {}
+
+        matches, new_hash = password_hasher.verify_sync(password, user.password)
+        if not matches:
+            return False, {}
+        if new_hash:
+            # Plain-text or outdated hash: upgrade it now that we know the password
+            user.password = new_hash
+            session.commit()
+            session.refresh(user)
         return True, user
     except Exception as e:
         return False, {}
@@ -91,8 +97,14 @@ def update_user(session: Session, user_id: int, data: dict,role:str="user"):
     if not user:
         return None
 
+    if data.get("password"):
+        data = {**data, "password": password_hasher.hash_sync(data["password"])}
     for key, value in data.items():
         setattr(user, key, value)
+    if target_model is User and "name" in data:
+        sync_user_name(session, user)
+    elif target_model is Restaurant and ("name" in data or "address" in data):
+        sync_restaurant_details(session, user)
 
     session.commit()
     session.refresh(user)
@@ -1,16 +1,220 @@
 from sqlmodel import SQLModel, create_engine,Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from database.search_index import create_search_index
+from services.request_metrics import instrument_engine
+import threading
 import os
 
 sqlite_file_name = "food_delivery_new.db"
 sqlite_url = f"sqlite:///{sqlite_file_name}"
 
-engine = create_engine(sqlite_url, echo=False)
+# Engine settings (override through environment variables)
+DATABASE_URL = os.getenv("DATABASE_URL", sqlite_url)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+# Pool settings, used for server databases (PostgreSQL, ...)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# SQLite pragmas, applied on every new connection
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-20000"))  # negative = KiB
+
+
+def is_sqlite_url(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+# Async drivers used for the event-loop request path
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """sqlite:///x.db -> sqlite+aiosqlite:///x.db, postgresql://... -> postgresql+asyncpg://..."""
+    scheme, sep, rest = url.partition("://")
+    base = scheme.split("+")[0]
+    return f"{ASYNC_DRIVERS.get(base, scheme)}{sep}{rest}"
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def build_engine(url: str = DATABASE_URL, echo: bool = DB_ECHO):
+    """Create the engine with pool / pragma settings for the given database url"""
+    if not is_sqlite_url(url):
+        return create_engine(
+            url,
+            echo=echo,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+
+    connect_args = {
+        # Sessions are opened in FastAPI's threadpool, not the creating thread
+        "check_same_thread": False,
+        "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+    }
+
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        # In-memory databases only exist per connection, so share one
+        new_engine = create_engine(url, echo=echo, connect_args=connect_args, poolclass=StaticPool)
+    else:
+        new_engine = create_engine(
+            url,
+            echo=echo,
+            connect_args=connect_args,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+
+    event.listen(new_engine, "connect", apply_sqlite_pragmas)
+    return new_engine
+
+
+def build_async_engine(url: str = DATABASE_URL, echo: bool = DB_ECHO):
+    """Async twin of build_engine, used by the async CRUD layer"""
+    async_url = to_async_url(url)
+    if not is_sqlite_url(url):
+        return create_async_engine(
+            async_url,
+            echo=echo,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        new_engine = create_async_engine(async_url, echo=echo, poolclass=StaticPool)
+    else:
+        new_engine = create_async_engine(
+            async_url,
+            echo=echo,
+            connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+
+    event.listen(new_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    return new_engine
+
+
+class PoolMetrics:
+    """Counts pool checkouts / checkins so we can see how busy the pool is"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connections_created += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connections_created": self.connections_created,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+            }
+
+
+def attach_pool_metrics(target_engine) -> PoolMetrics:
+    metrics = PoolMetrics()
+    event.listen(target_engine, "connect", metrics.on_connect)
+    event.listen(target_engine, "checkout", metrics.on_checkout)
+    event.listen(target_engine, "checkin", metrics.on_checkin)
+    return metrics
+
+
+engine = build_engine()
+pool_metrics = attach_pool_metrics(engine)
+
+async_engine = build_async_engine()
+async_pool_metrics = attach_pool_metrics(async_engine.sync_engine)
+
+# Per-request statement counts / DB time for the metrics middleware
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+
+def get_pool_status() -> dict:
+    """Pool configuration and checkout counters for the health endpoint"""
+    return {
+        "dialect": engine.dialect.name,
+        "pool_class": type(engine.pool).__name__,
+        "pool": engine.pool.status(),
+        **pool_metrics.snapshot(),
+        "async": {
+            "pool": async_engine.pool.status(),
+            **async_pool_metrics.snapshot(),
+        },
+    }
 
 def create_db_and_tables():
     # This command creates the .db file and all tables defined in models.py
     SQLModel.metadata.create_all(engine)
+    # create_all skips existing tables, so add indexes declared after the table was created
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    create_search_index(engine)
 
 def get_session():
     with Session(engine) as session:
         yield session
 
+async def get_async_session():
+    # expire_on_commit=False: attributes stay loaded, no lazy IO after commit
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+async def dispose_engines():
+    await async_engine.dispose()
+    engine.dispose()
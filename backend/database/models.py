@@ -2,6 +2,7 @@ from enum import Enum
 from typing import Optional, List
 from datetime import datetime, time
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 
 
 # 1. Define Enum for status validation
@@ -46,7 +47,11 @@ class Restaurant(SQLModel, table=True):
 # --- CATEGORY TABLE ---
 class Category(SQLModel, table=True):
     __tablename__ = "categories"
-    __table_args__ = {"extend_existing": True} # <--- Add to ALL classes
+    __table_args__ = (
+        # "Which categories are open now" range scans
+        Index("ix_categories_window", "start_time", "end_time"),
+        {"extend_existing": True},
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     start_time: time 
@@ -75,7 +80,11 @@ class DeliveryPartner(SQLModel, table=True):
 # --- MENU TABLE ---
 class Menu(SQLModel, table=True):
     __tablename__ = "menus"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Menu page: all items of a restaurant, grouped by category
+        Index("ix_menus_restaurant_category", "restaurant_id", "category_id"),
+        {"extend_existing": True},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
@@ -92,7 +101,14 @@ class Menu(SQLModel, table=True):
 # --- ORDER TABLE ---
 class Order(SQLModel, table=True):
     __tablename__ = "orders"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Order history pages, newest first
+        Index("ix_orders_restaurant_created", "restaurant_id", "created_at"),
+        Index("ix_orders_user_created", "user_id", "created_at"),
+        # Delivery board: active orders across all restaurants
+        Index("ix_orders_status_created", "status", "created_at"),
+        {"extend_existing": True},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
@@ -112,7 +128,11 @@ class Order(SQLModel, table=True):
 # --- ORDER ITEM TABLE ---
 class OrderItem(SQLModel, table=True):
     __tablename__ = "order_items"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Lines of an order (bill, order summaries, item loading)
+        Index("ix_order_items_order", "order_id"),
+        {"extend_existing": True},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     order_id: int = Field(foreign_key="orders.id")
@@ -122,3 +142,33 @@ class OrderItem(SQLModel, table=True):
 
     order: "Order" = Relationship(back_populates="items")
     menu: "Menu" = Relationship(back_populates="order_items")
+
+# --- ORDER SUMMARY READ MODEL ---
+class OrderSummary(SQLModel, table=True):
+    """
+    One denormalized row per order for the order list pages, written by
+    crud.order_summaries in the same transaction as the order itself.
+    """
+    __tablename__ = "order_summaries"
+    __table_args__ = (
+        # Newest-first keyset pages per user / restaurant, no joins
+        Index("ix_order_summaries_user_created", "user_id", "created_at", "order_id"),
+        Index("ix_order_summaries_restaurant_created", "restaurant_id", "created_at", "order_id"),
+        {"extend_existing": True},
+    )
+
+    order_id: int = Field(primary_key=True, foreign_key="orders.id")
+    user_id: int
+    restaurant_id: int
+    delivery_partner_id: Optional[int] = None
+    status: OrderStatus = Field(default=OrderStatus.PLACED)
+    total_amount: float
+    created_at: datetime
+
+    restaurant_name: str
+    restaurant_address: str
+    user_name: Optional[str] = None
+    item_count: int = 0
+    first_item_pic: Optional[str] = None
+    # JSON [[menu_id, name, quantity, menu_item_pic], ...] in cart order
+    items_digest: str = "[]"
@@ -0,0 +1,138 @@
+import re
+from sqlalchemy import text, inspect, Integer, Float
+
+# SQLite FTS5 index over menu and restaurant names.
+# Triggers keep it in sync with every write path (routers, crud, raw SQL),
+# so application code never has to update it by hand.
+
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+SEARCH_INDEX_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS menu_search USING fts5(
+        name, restaurant_name, tokenize = '{FTS_TOKENIZER}', prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS restaurant_search USING fts5(
+        name, tokenize = '{FTS_TOKENIZER}', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS menus_search_insert AFTER INSERT ON menus BEGIN
+        INSERT INTO menu_search (rowid, name, restaurant_name)
+        VALUES (new.id, new.name, (SELECT name FROM restaurants WHERE id = new.restaurant_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS menus_search_update AFTER UPDATE OF name, restaurant_id ON menus BEGIN
+        DELETE FROM menu_search WHERE rowid = old.id;
+        INSERT INTO menu_search (rowid, name, restaurant_name)
+        VALUES (new.id, new.name, (SELECT name FROM restaurants WHERE id = new.restaurant_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS menus_search_delete AFTER DELETE ON menus BEGIN
+        DELETE FROM menu_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS restaurants_search_insert AFTER INSERT ON restaurants BEGIN
+        INSERT INTO restaurant_search (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS restaurants_search_update AFTER UPDATE OF name ON restaurants BEGIN
+        DELETE FROM restaurant_search WHERE rowid = old.id;
+        INSERT INTO restaurant_search (rowid, name) VALUES (new.id, new.name);
+        UPDATE menu_search SET restaurant_name = new.name
+        WHERE rowid IN (SELECT id FROM menus WHERE restaurant_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS restaurants_search_delete AFTER DELETE ON restaurants BEGIN
+        DELETE FROM restaurant_search WHERE rowid = old.id;
+    END
+    """,
+]
+
+REBUILD_SQL = [
+    "DELETE FROM menu_search",
+    "DELETE FROM restaurant_search",
+    """
+    INSERT INTO menu_search (rowid, name, restaurant_name)
+    SELECT m.id, m.name, r.name FROM menus m LEFT JOIN restaurants r ON r.id = m.restaurant_id
+    """,
+    "INSERT INTO restaurant_search (rowid, name) SELECT id, name FROM restaurants",
+    "INSERT INTO menu_search (menu_search) VALUES ('optimize')",
+    "INSERT INTO restaurant_search (restaurant_search) VALUES ('optimize')",
+]
+
+# Set by create_search_index; queries fall back to ILIKE when the index is missing
+search_index_state = {"enabled": False}
+
+
+def fts5_available(connection) -> bool:
+    options = connection.exec_driver_sql("PRAGMA compile_options").scalars().all()
+    return "ENABLE_FTS5" in options
+
+
+def create_search_index(engine) -> bool:
+    """Create the FTS tables and triggers (SQLite only), backfilling on first creation"""
+    if engine.dialect.name != "sqlite":
+        search_index_state["enabled"] = False
+        return False
+
+    with engine.begin() as connection:
+        if not fts5_available(connection):
+            search_index_state["enabled"] = False
+            return False
+        is_new = not inspect(connection).has_table("menu_search")
+        for statement in SEARCH_INDEX_DDL:
+            connection.exec_driver_sql(statement)
+        if is_new:
+            for statement in REBUILD_SQL:
+                connection.exec_driver_sql(statement)
+
+    search_index_state["enabled"] = True
+    return True
+
+
+def rebuild_search_index(engine):
+    with engine.begin() as connection:
+        for statement in REBUILD_SQL:
+            connection.exec_driver_sql(statement)
+
+
+def is_search_index_enabled() -> bool:
+    return search_index_state["enabled"]
+
+
+def to_fts_query(keyword: str) -> str:
+    """'chick bir' -> '"chick"* "bir"*' : every word must match as a prefix"""
+    tokens = re.findall(r"\w+", keyword.lower())
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def match_sql(fts_table: str, id_column: str) -> str:
+    # Every match is ranked; callers apply their filters and LIMIT on top
+    return f"SELECT rowid AS {id_column}, rank FROM {fts_table} WHERE {fts_table} MATCH :fts_query"
+
+
+def menu_search_subquery(keyword: str):
+    """(menu_id, rank) rows for menus whose name or restaurant name match the keyword"""
+    return (
+        text(match_sql("menu_search", "menu_id"))
+        .bindparams(fts_query=to_fts_query(keyword))
+        .columns(menu_id=Integer, rank=Float)
+        .subquery("menu_fts")
+    )
+
+
+def restaurant_search_subquery(keyword: str):
+    return (
+        text(match_sql("restaurant_search", "restaurant_id"))
+        .bindparams(fts_query=to_fts_query(keyword))
+        .columns(restaurant_id=Integer, rank=Float)
+        .subquery("restaurant_fts")
+    )
@@ -1,5 +1,10 @@
+import asyncio
 from fastapi import FastAPI
-from database.database import create_db_and_tables
+from fastapi.responses import PlainTextResponse
+from services.json_response import FastJSONResponse
+from database.database import create_db_and_tables, get_pool_status, dispose_engines, engine
+from sqlmodel import Session
+from crud.order_summaries import backfill_order_summaries
 from fastapi.middleware.cors import CORSMiddleware
 from routers.delivery import router as delivery_router
 from routers.users import router as users_router
@@ -7,16 +12,73 @@ from routers.restaurants import router as restaurants_router
 from routers.orders import router as orders_router
 from routers.menu import router as menu_router
 from routers.category import router as category_router
+from routers.events import router as events_router
+from routers.auth import router as auth_router
+from services.dispatch import run_dispatcher, DISPATCH_INTERVAL_SECONDS
+from services.uploads import UploadSizeLimitMiddleware
+from services.static_files import UploadStaticFiles
+from services.image_variants import image_variants
+from services.passwords import password_hasher, login_metrics
+from services.tokens import token_service
+from services.request_metrics import RequestMetricsMiddleware, metrics_registry
+from services.compression import CompressionMiddleware
 
-from fastapi.staticfiles import StaticFiles
-
-app = FastAPI()
-app.mount("/uploads", StaticFiles(directory="uploads"), name="static")
+app = FastAPI(default_response_class=FastJSONResponse)
+app.mount("/uploads", UploadStaticFiles(directory="uploads"), name="static")
 
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    # Orders placed before the order_summaries read model existed
+    with Session(engine) as session:
+        backfill_order_summaries(session)
+
+@app.on_event("startup")
+async def start_dispatcher():
+    app.state.dispatcher = None
+    if DISPATCH_INTERVAL_SECONDS > 0:
+        app.state.dispatcher = asyncio.create_task(run_dispatcher(engine))
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if app.state.dispatcher:
+        app.state.dispatcher.cancel()
+    image_variants.shutdown()
+    await dispose_engines()
+
+@app.get("/health/db")
+def db_health():
+    return {"status": "success", "pool": get_pool_status()}
+
+@app.get("/health/auth")
+def auth_health():
+    return {
+        "status": "success",
+        "hasher": password_hasher.snapshot(),
+        "logins": login_metrics.snapshot(),
+        "tokens": token_service.snapshot()
+    }
+
+def pool_gauge_lines() -> list:
+    pool = get_pool_status()
+    lines = ["# TYPE db_pool_checked_out gauge"]
+    lines.append(f'db_pool_checked_out{{engine="sync"}} {pool["checked_out"]}')
+    lines.append(f'db_pool_checked_out{{engine="async"}} {pool["async"]["checked_out"]}')
+    lines.append("# TYPE db_pool_connections_created_total counter")
+    lines.append(f'db_pool_connections_created_total{{engine="sync"}} {pool["connections_created"]}')
+    lines.append(f'db_pool_connections_created_total{{engine="async"}} {pool["async"]["connections_created"]}')
+    return lines
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint: per-route latency, SQL statement counts, DB time, N+1 flags"""
+    return PlainTextResponse(
+        metrics_registry.render(pool_gauge_lines()),
+        media_type="text/plain; version=0.0.4"
+    )
 
+# Added first so CORS headers are also set on its 413 responses
+app.add_middleware(UploadSizeLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -24,10 +86,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+# Added last so it is outermost and times the whole stack
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(delivery_router)
 app.include_router(users_router)
 app.include_router(restaurants_router)
 app.include_router(orders_router)
 app.include_router(menu_router)
-app.include_router(category_router)
\ No newline at end of file
+app.include_router(category_router)
+app.include_router(events_router)
+app.include_router(auth_router)
\ No newline at end of file
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from services.tokens import token_service, get_token_claims, TokenClaims
+from logger_config import get_logger
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+logger = get_logger("AuthAPI")
+
+
+@router.get("/me")
+async def who_am_i(claims: TokenClaims = Depends(get_token_claims)):
+    """Identity carried by the bearer token (no database lookup)"""
+    return {
+        "status": "success",
+        "account_id": claims.account_id,
+        "role": claims.role,
+        "expires_at": claims.expires_at
+    }
+
+
+@router.post("/logout")
+async def logout(claims: TokenClaims = Depends(get_token_claims)):
+    token_service.revoke(claims)
+    logger.info("Token revoked | account_id=%s | role=%s", claims.account_id, claims.role)
+    return {"status": "success", "message": "Logged out"}
@@ -3,7 +3,9 @@ from datetime import time
 from sqlmodel import select, Session
 from database.models import Category
 from database.database import get_session
+from crud.projections import list_category_timings
 from logger_config import get_logger
+from services.menu_cache import menu_cache
 
 router = APIRouter(prefix="/category", tags=["Category"])
 logger = get_logger("CategoryAPI")
@@ -60,6 +62,7 @@ def add_category_timing(
         session.add(category)
         session.commit()
         session.refresh(category)
+        menu_cache.invalidate(restaurant_id)
 
         return {
             "status": "success",
@@ -119,6 +122,7 @@ def update_category_timing(
         session.add(category)
         session.commit()
         session.refresh(category)
+        menu_cache.invalidate(category.restaurant_id)
 
         return {
             "status": "success",
@@ -158,6 +162,7 @@ def delete_category(
 
         session.delete(category)
         session.commit()
+        menu_cache.invalidate(category.restaurant_id)
 
         return {
             "status": "success",
@@ -179,21 +184,9 @@ def get_category_timings(
     logger.info("Fetch category timings for restaurant %s", restaurant_id)
 
     try:
-        categories = session.exec(
-            select(Category).where(Category.restaurant_id == restaurant_id)
-        ).all()
-
         return {
             "status": "success",
-            "categories": [
-                {
-                    "id": c.id,
-                    "name": c.name,
-                    "start_time": str(c.start_time),
-                    "end_time": str(c.end_time)
-                }
-                for c in categories
-            ]
+            "categories": list_category_timings(session, restaurant_id)
         }
 
     except Exception as e:
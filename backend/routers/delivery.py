@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Form, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, Form, UploadFile, File, Depends, HTTPException, Query
+from typing import List, Optional
 from sqlmodel import Session
-from database.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.database import get_session, get_async_session
+from database.models import OrderStatus
 from crud.delivery_crud import (
     check_delivery_partner_exists,
     create_delivery_partner,
-    verify_delivery_partner,
-    get_all_delivery_partners,
     get_delivery_partner
 )
+from crud.async_delivery_crud import get_delivery_board, BOARD_STATUSES
+from crud.projections import list_delivery_persons
+from routers.schemas import or_error, DeliveryLoginResponse
+from crud.async_users_crud import authenticate_account
+from services.tokens import token_service
+from services.passwords import login_metrics, PasswordHasherBusy
+from starlette.concurrency import run_in_threadpool
+from services.dispatch import dispatch_pending_orders, DISPATCH_POLICY, DISPATCH_POLICIES, DISPATCH_BATCH_SIZE
+from services.partner_index import partner_index
+from services.uploads import save_image_upload, UploadTooLarge
+from services.image_variants import image_url
+from crud.pagination import InvalidCursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from logger_config import get_logger
 import os
 import shutil
+import time
 
 router = APIRouter(prefix="/delivery", tags=["Delivery"])
 logger = get_logger("DeliveryAPI")
@@ -42,18 +56,10 @@ async def register_delivery_partner(
             }
 
         # Handle file upload if provided and has actual content
-        file_path = None
-        if delivery_person_profile and delivery_person_profile.filename:
-            # Check if file has actual content (not empty Blob)
-            content = await delivery_person_profile.read()
-            if len(content) > 0:
-                # Save the file
-                file_path = f"{UPLOAD_DIR}/{email.replace('@', '_').replace('.', '_')}_{delivery_person_profile.filename}"
-                with open(file_path, "wb") as buffer:
-                    buffer.write(content)
-                logger.info("Profile picture saved: %s", file_path)
-            else:
-                logger.info("Empty file received, skipping upload")
+        # Empty files (an empty Blob from the form) come back as None
+        file_path = await save_image_upload(delivery_person_profile, UPLOAD_DIR)
+        if file_path:
+            logger.info("Profile picture saved: %s", file_path)
 
         # Prepare data for creation with correct field name
         data = {
@@ -67,7 +73,8 @@ async def register_delivery_partner(
         }
 
         # Create delivery partner
-        partner = create_delivery_partner(session, data)
+        # Hashing the password blocks, so keep it off the event loop
+        partner = await run_in_threadpool(create_delivery_partner, session, data)
         logger.info("Delivery partner registered successfully: %s", email)
 
         return {
@@ -85,6 +92,8 @@ async def register_delivery_partner(
                 "is_available": partner.is_available
             }
         }
+    except UploadTooLarge as e:
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error("Failed to register delivery partner: %s", str(e), exc_info=True)
         return {
@@ -111,19 +120,21 @@ async def add_delivery_person(
     )
 
 
-@router.post("/login")
+@router.post("/login", response_model=or_error(DeliveryLoginResponse))
 async def delivery_login(
     email: str = Form(...),
     password: str = Form(...),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     logger.info("Delivery login attempt: %s", email)
+    start = time.perf_counter()
 
     try:
         # Verify delivery partner credentials
-        is_valid, partner = verify_delivery_partner(session, email, password)
+        partner = await authenticate_account(session, email, password, "delivery_person")
 
-        if is_valid:
+        if partner:
+            login_metrics.observe("delivery_person", "success", time.perf_counter() - start)
             logger.info("Delivery login successful: %s", email)
             return {
                 "status": "success",
@@ -137,48 +148,38 @@ async def delivery_login(
                     "address": partner.address,
                     "profile_picture": partner.delivery_person_profile,
                     "is_available": partner.is_available
-                }
+                },
+                **token_service.login_payload(partner.id, "delivery_person")
             }
         else:
+            login_metrics.observe("delivery_person", "failed", time.perf_counter() - start)
             logger.warning("Invalid delivery login for %s", email)
             return {
                 "status": "error",
                 "message": "Invalid email or password"
             }
+    except PasswordHasherBusy as e:
+        login_metrics.observe("delivery_person", "busy", time.perf_counter() - start)
+        logger.warning("Delivery login rejected, password pool busy: %s", email)
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error("Login error: %s", str(e), exc_info=True)
         return {"status": "error", "message": "Login failed"}
 
 
 @router.get("/")
-async def get_all_delivery_persons(session: Session = Depends(get_session)):
+async def get_all_delivery_persons(session: AsyncSession = Depends(get_async_session)):
     logger.info("Fetching all delivery persons")
     try:
-        partners = get_all_delivery_partners(session)
+        delivery_persons_list = await list_delivery_persons(session)
 
-        if not partners:
+        if not delivery_persons_list:
             return {
                 "status": "success",
                 "delivery_persons": [],
                 "message": "No delivery persons available"
             }
 
-        # Format response
-        delivery_persons_list = [
-            {
-                "id": partner.id,
-                "name": partner.name,
-                "email": partner.email,
-                "mobile": partner.mobile,
-                "vehicle": partner.vehicle,
-                "address": partner.address,
-                "profile_picture": partner.delivery_person_profile,
-                "is_available": partner.is_available,
-                "created_at": partner.created_at.isoformat() if hasattr(partner, 'created_at') else None
-            }
-            for partner in partners
-        ]
-
         return {
             "status": "success",
             "count": len(delivery_persons_list),
@@ -190,6 +191,112 @@ async def get_all_delivery_persons(session: Session = Depends(get_session)):
         return {"status": "error", "message": "Internal server error"}
 
 
+@router.get("/board")
+async def delivery_board(
+    status: List[OrderStatus] = Query(default=BOARD_STATUSES),
+    partner_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Deliverable orders across all restaurants in one call (replaces per-restaurant fetches)"""
+    logger.info("Fetching delivery board | statuses=%s | partner_id=%s", status, partner_id)
+    BASE_URL = "http://127.0.0.1:8000"
+
+    try:
+        orders, items_by_order, next_cursor = await get_delivery_board(
+            session, status, partner_id, cursor, limit
+        )
+    except InvalidCursor:
+        return {"status": "error", "message": "Invalid cursor"}
+    except Exception as e:
+        logger.error("Failed to fetch delivery board: %s", str(e), exc_info=True)
+        return {"status": "error", "message": "Internal server error"}
+
+    board = []
+    for o in orders:
+        items = items_by_order[o.id]
+        board.append({
+            "order_id": o.id,
+            "status": o.status,
+            "total_amount": o.total_amount,
+            "created_at": o.created_at.isoformat(),
+            "date": o.created_at.isoformat(),
+            "order_image": image_url(items[0].menu_item_pic, "small", BASE_URL) if items else None,
+            "delivery_partner_id": o.delivery_partner_id,
+            "restaurant": {
+                "id": o.restaurant_id,
+                "name": o.restaurant_name,
+                "address": o.restaurant_address
+            },
+            "user": {
+                "id": o.user_id,
+                "name": o.user_name or "Guest",
+                "address": o.user_address,
+                "mobile": o.user_mobile
+            },
+            "items": [
+                {
+                    "menu_id": item.menu_id,
+                    "menu_item_name": item.name,
+                    "quantity": item.quantity,
+                    "menu_item_pic": image_url(item.menu_item_pic, "thumb", BASE_URL)
+                }
+                for item in items
+            ]
+        })
+
+    return {
+        "status": "success",
+        "count": len(board),
+        "orders": board,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
+
+
+@router.post("/dispatch")
+def dispatch_orders(
+    policy: str = Query(DISPATCH_POLICY),
+    limit: int = Query(DISPATCH_BATCH_SIZE, ge=1, le=500),
+    session: Session = Depends(get_session)
+):
+    """Auto-assign waiting orders to free partners (round_robin / least_recent / load_balanced)"""
+    if policy not in DISPATCH_POLICIES:
+        return {"status": "error", "message": f"Unknown policy. Use one of: {', '.join(DISPATCH_POLICIES)}"}
+
+    logger.info("Dispatch run: policy=%s limit=%s", policy, limit)
+    try:
+        result = dispatch_pending_orders(session, policy, limit)
+        return {
+            "status": "success",
+            "assigned_count": len(result["assigned"]),
+            "assigned": result["assigned"],
+            "unassigned": result["unassigned"]
+        }
+    except Exception as e:
+        logger.error("Dispatch failed: %s", str(e), exc_info=True)
+        return {"status": "error", "message": "Internal server error"}
+
+
+@router.get("/available")
+def get_available_delivery_persons(session: Session = Depends(get_session)):
+    """Free partners from the in-memory availability index"""
+    partners = partner_index.available(session)
+    return {
+        "status": "success",
+        "count": len(partners),
+        "available": [
+            {
+                "id": slot.partner_id,
+                "assigned_count": slot.assigned_count,
+                "last_assigned_at": slot.last_assigned_at.isoformat() if slot.last_assigned_at else None
+            }
+            for slot in partners
+        ]
+    }
+
+
 @router.get("/{partner_id}")
 async def get_delivery_person(
     partner_id: int,
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import os
+from services.order_events import order_events, channel_name, CHANNEL_TYPES
+from logger_config import get_logger
+
+router = APIRouter(prefix="/events", tags=["Events"])
+logger = get_logger("EventsAPI")
+
+# Idle connections get a ping this often so proxies keep them open and dead clients are noticed
+HEARTBEAT_SECONDS = float(os.getenv("ORDER_EVENTS_HEARTBEAT_SECONDS", "15"))
+
+
+@router.websocket("/ws/{channel_type}/{channel_id}")
+async def order_events_ws(websocket: WebSocket, channel_type: str, channel_id: int):
+    """Push order events for a restaurant / user / partner as JSON messages"""
+    if channel_type not in CHANNEL_TYPES:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    subscription = order_events.subscribe(channel_name(channel_type, channel_id))
+    logger.info("WebSocket subscribed: %s", subscription.channel)
+
+    async def pump():
+        while True:
+            event = await subscription.next_event(HEARTBEAT_SECONDS)
+            await websocket.send_json(event or {"type": "ping"})
+
+    async def wait_for_close():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    tasks = [asyncio.create_task(pump()), asyncio.create_task(wait_for_close())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Retrieve every outcome, so a send on a dead socket is not reported as an unhandled task error
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        order_events.unsubscribe(subscription)
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, WebSocketDisconnect):
+                logger.info("WebSocket dropped: %s | error=%s", subscription.channel, str(result))
+        logger.info("WebSocket closed: %s", subscription.channel)
+
+
+@router.get("/sse/{channel_type}/{channel_id}")
+async def order_events_sse(request: Request, channel_type: str, channel_id: int):
+    """Same events as the WebSocket channel, as a text/event-stream"""
+    if channel_type not in CHANNEL_TYPES:
+        return {"status": "error", "message": "Unknown channel type"}
+
+    async def stream():
+        # Subscribe only once the response is streaming: a client gone before
+        # then never runs this generator, and so never reaches the unsubscribe below
+        subscription = order_events.subscribe(channel_name(channel_type, channel_id))
+        logger.info("SSE subscribed: %s", subscription.channel)
+        try:
+            yield f"retry: {int(HEARTBEAT_SECONDS * 1000)}\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.next_event(HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            order_events.unsubscribe(subscription)
+            logger.info("SSE closed: %s", subscription.channel)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,13 +1,30 @@
-from fastapi import APIRouter, Form, File, UploadFile, Depends,Query
+from fastapi import APIRouter, Form, File, UploadFile, Depends,Query, Request
+from fastapi.responses import Response
 from sqlmodel import Session, select
 from typing import Optional
 from datetime import datetime
+from pydantic import BaseModel, Field
+import codecs
+import csv
 import os
 
-from database.models import Menu, Category,Restaurant  # Using your existing models
-from database.database import get_session
+from database.models import Menu, Category,Restaurant, OrderSummary  # Using your existing models
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.database import get_session, get_async_session
 from logger_config import get_logger
-from crud.menu_crud import search_dashboard_menu
+from services.menu_cache import menu_cache, etag_matches
+from services.compression import choose_encoding
+from starlette.concurrency import run_in_threadpool
+from services.uploads import store_image_upload, UploadTooLarge
+from services.image_variants import image_urls, remove_image
+from services.json_response import dumps
+from crud.menu_crud import create_multiple_menu_items
+from crud.projections import list_restaurant_cards
+from crud.async_menu_crud import (
+    get_restaurant_menu_grouped,
+    search_restaurants,
+    search_dashboard_menu
+)
 
 router = APIRouter(prefix="/menu", tags=["Menu"])
 logger = get_logger("MenuAPI")
@@ -35,11 +52,7 @@ def add_menu_item(
             return {"status": "error", "message": "Invalid category for this restaurant"}
 
         # Handle image upload
-        pic_path = None
-        if menu_item_pic:
-            pic_path = f"{MENU_UPLOAD_DIR}/{restaurant_id}_{category_id}_{menu_item_pic.filename}"
-            with open(pic_path, "wb") as f:
-                f.write(menu_item_pic.file.read())
+        pic_path = store_image_upload(menu_item_pic, MENU_UPLOAD_DIR)
 
         # Create menu item using your Menu model
         menu_item = Menu(
@@ -54,6 +67,7 @@ def add_menu_item(
         session.add(menu_item)
         session.commit()
         session.refresh(menu_item)
+        menu_cache.invalidate(restaurant_id)
 
         return {
             "status": "success",
@@ -67,12 +81,70 @@ def add_menu_item(
             }
         }
 
+    except UploadTooLarge as e:
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error("Add menu item failed: %s", str(e), exc_info=True)
         session.rollback()
         return {"status": "error", "message": "Failed to add menu item"}
 
 
+MAX_IMPORT_ROWS = 10000
+
+
+class MenuImportRequest(BaseModel):
+    # rows: name, price, category_id or category (name), is_available, menu_item_pic
+    items: list[dict] = Field(min_length=1, max_length=MAX_IMPORT_ROWS)
+
+
+@router.post("/{restaurant_id}/import")
+def import_menu_items(
+    restaurant_id: int,
+    payload: MenuImportRequest,
+    session: Session = Depends(get_session)
+):
+    """Bulk menu onboarding from a JSON list of items"""
+    logger.info("Importing %d menu items for restaurant %d", len(payload.items), restaurant_id)
+
+    try:
+        summary = create_multiple_menu_items(session, restaurant_id, payload.items)
+        logger.info("Menu import done | restaurant_id=%s | created=%s | failed=%s",
+                    restaurant_id, summary["created"], summary["failed"])
+        return {"status": "success", **summary}
+
+    except Exception as e:
+        logger.error("Menu import failed: %s", str(e), exc_info=True)
+        session.rollback()
+        return {"status": "error", "message": "Failed to import menu items"}
+
+
+@router.post("/{restaurant_id}/import/csv")
+def import_menu_items_csv(
+    restaurant_id: int,
+    menu_file: UploadFile = File(...),
+    session: Session = Depends(get_session)
+):
+    """Bulk menu onboarding from a CSV file with a header row (same columns as the JSON import)"""
+    logger.info("Importing menu CSV '%s' for restaurant %d", menu_file.filename, restaurant_id)
+
+    try:
+        # Rows are decoded and parsed lazily from the spooled upload, never held in memory at once
+        reader = csv.DictReader(codecs.iterdecode(menu_file.file, "utf-8-sig"))
+        summary = create_multiple_menu_items(session, restaurant_id, reader)
+        logger.info("Menu CSV import done | restaurant_id=%s | created=%s | failed=%s",
+                    restaurant_id, summary["created"], summary["failed"])
+        return {"status": "success", **summary}
+
+    except (UnicodeDecodeError, csv.Error) as e:
+        logger.error("Invalid menu CSV: %s", str(e), exc_info=True)
+        session.rollback()
+        return {"status": "error", "message": "Invalid CSV file"}
+    except Exception as e:
+        logger.error("Menu CSV import failed: %s", str(e), exc_info=True)
+        session.rollback()
+        return {"status": "error", "message": "Failed to import menu items"}
+
+
 @router.put("/{menu_item_id}/update")
 def update_menu_item(
     menu_item_id: int,
@@ -100,15 +172,14 @@ def update_menu_item(
             menu_item.is_available = is_available
 
         # Handle image update
-        if menu_item_pic:
-            pic_path = f"{MENU_UPLOAD_DIR}/{menu_item.restaurant_id}_{menu_item.category_id}_{menu_item_pic.filename}"
-            with open(pic_path, "wb") as f:
-                f.write(menu_item_pic.file.read())
+        pic_path = store_image_upload(menu_item_pic, MENU_UPLOAD_DIR)
+        if pic_path:
             menu_item.menu_item_pic = pic_path
 
         session.add(menu_item)
         session.commit()
         session.refresh(menu_item)
+        menu_cache.invalidate(menu_item.restaurant_id)
 
         return {
     "status": "success",
@@ -123,12 +194,25 @@ def update_menu_item(
     }
 }
 
+    except UploadTooLarge as e:
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error("Update menu item failed: %s", str(e), exc_info=True)
         session.rollback()
         return {"status": "error", "message": "Failed to update menu item"}
 
 
+def image_in_use(session: Session, pic_path: str) -> bool:
+    if session.exec(select(Menu.id).where(Menu.menu_item_pic == pic_path)).first():
+        return True
+    return session.exec(
+        select(OrderSummary.order_id).where(
+            (OrderSummary.first_item_pic == pic_path)
+            | OrderSummary.items_digest.contains(pic_path, autoescape=True)
+        )
+    ).first() is not None
+
+
 @router.delete("/{menu_item_id}")
 def delete_menu_item(
     menu_item_id: int,
@@ -143,13 +227,16 @@ def delete_menu_item(
         if not menu_item:
             return {"status": "error", "message": "Menu item not found"}
 
-        # Delete image file if exists
-        if menu_item.menu_item_pic and os.path.exists(menu_item.menu_item_pic):
-            os.remove(menu_item.menu_item_pic)
-
+        pic_path = menu_item.menu_item_pic
         session.delete(menu_item)
         session.commit()
 
+        # Uploads are stored by content hash, so other items may share the image,
+        # and order history keeps showing the pictures of items it contains
+        if pic_path and not image_in_use(session, pic_path):
+            remove_image(pic_path)
+        menu_cache.invalidate(menu_item.restaurant_id)
+
         return {
             "status": "success",
             "message": "Menu item deleted successfully"
@@ -162,55 +249,45 @@ def delete_menu_item(
 
 
 @router.get("/{restaurant_id}")
-def get_restaurant_menu(
+async def get_restaurant_menu(
     restaurant_id: int,
+    request: Request,
     category_id: Optional[int] = None,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Get all menu items for a restaurant, optionally filtered by category"""
     logger.info("Fetching menu for restaurant %d", restaurant_id)
 
     try:
-        # Build query
-        query = select(Menu).where(Menu.restaurant_id == restaurant_id)
-        
-        if category_id:
-            query = query.where(Menu.category_id == category_id)
-
-        menu_items = session.exec(query).all()
-
-        # Get categories for this restaurant
-        categories = session.exec(
-            select(Category).where(Category.restaurant_id == restaurant_id)
-        ).all()
-
-        # Organize menu items by category
-        menu_by_category = {}
-        for category in categories:
-            category_items = [
-                {
-            "id": item.id,
-            "name": item.name,
-            "price": item.price,
-            "is_available": item.is_available,
-            "menu_item_pic": item.menu_item_pic
-        }
-                for item in menu_items if item.category_id == category.id
-            ]
-            
-            if category_items:  # Only include categories with items
-                menu_by_category[category.name] = {
-                    "category_id": category.id,
-                    "start_time": str(category.start_time) if category.start_time else None,
-                    "end_time": str(category.end_time) if category.end_time else None,
-                    "items": category_items
-                }
-
-        return {
-            "status": "success",
-            "restaurant_id": restaurant_id,
-            "menu": menu_by_category
-        }
+        cached = menu_cache.get(restaurant_id, category_id)
+        cache_status = "HIT"
+        if cached is None:
+            cache_status = "MISS"
+            # Read the version before the query so a concurrent write can't be cached as current
+            version = menu_cache.version(restaurant_id)
+            menu_by_category = await get_restaurant_menu_grouped(session, restaurant_id, category_id)
+
+            # Payload is already plain JSON types, so skip FastAPI's encoder pass
+            body = dumps({
+                "status": "success",
+                "restaurant_id": restaurant_id,
+                "menu": menu_by_category
+            })
+            cached = menu_cache.put(restaurant_id, category_id, version, body)
+
+        # Compressed once per cached menu and encoding, then reused for every request
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+        if cached.has_encoding(encoding):
+            body, etag = cached.encoded(encoding)
+        else:
+            body, etag = await run_in_threadpool(cached.encoded, encoding)
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Cache": cache_status, "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if body is not cached.body:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
 
     except Exception as e:
         logger.error("Get menu failed: %s", str(e), exc_info=True)
@@ -275,6 +352,7 @@ def toggle_availability(
         menu_item.is_available = is_available
         session.add(menu_item)
         session.commit()
+        menu_cache.invalidate(menu_item.restaurant_id)
 
         return {
             "status": "success",
@@ -325,7 +403,8 @@ def get_items_by_category(
                     "name": item.name,
                     "price": item.price,
                     "is_available": item.is_available,
-                    "menu_item_pic": item.menu_item_pic
+                    "menu_item_pic": item.menu_item_pic,
+                    "menu_item_images": image_urls(item.menu_item_pic)
                 }
                 for item in items
             ]
@@ -336,24 +415,18 @@ def get_items_by_category(
         return {"status": "error", "message": "Failed to fetch category items"}
     
 @router.get("/dashboard/search")
-def search_item_restaurant(
+async def search_item_restaurant(
     word_search: str | None = Query(default=None),
-    session: Session = Depends(get_session)
+    limit: int = Query(default=50, ge=1, le=200),
+    session: AsyncSession = Depends(get_async_session)
 ):
     logger.info(f"Dashboard search keyword: {word_search}")
 
 
     if not word_search:
-        restaurants = session.exec(select(Restaurant)).all()
-
-        restaurant_response = []
-        for r in restaurants:
-            restaurant_response.append({
-                "restaurant_id": r.id,
-                "name": r.name,
-                "address": r.address,
-                "restaurant_pic": r.restaurant_pic
-            })
+        restaurant_response = await list_restaurant_cards(session)
+        for card in restaurant_response:
+            card["restaurant_images"] = image_urls(card["restaurant_pic"])
 
         return {
             "status": "success",
@@ -365,11 +438,7 @@ def search_item_restaurant(
         }
 
 
-    restaurants = session.exec(
-        select(Restaurant).where(
-            Restaurant.name.ilike(f"%{word_search}%")
-        )
-    ).all()
+    restaurants = await search_restaurants(session, word_search, limit)
 
     restaurant_response = []
     for r in restaurants:
@@ -377,10 +446,11 @@ def search_item_restaurant(
             "restaurant_id": r.id,
             "name": r.name,
             "address": r.address,
-            "restaurant_pic": r.restaurant_pic
+            "restaurant_pic": r.restaurant_pic,
+            "restaurant_images": image_urls(r.restaurant_pic)
         })
 
-    menus = search_dashboard_menu(session, word_search)
+    menus = await search_dashboard_menu(session, word_search, limit=limit)
 
     menu_response = []
     for item in menus:
@@ -390,6 +460,7 @@ def search_item_restaurant(
             "price": item.price,
             "is_available": item.is_available,
             "menu_item_pic": item.menu_item_pic,
+            "menu_item_images": image_urls(item.menu_item_pic),
             "restaurant": {
                 "id": item.restaurant.id,
                 "name": item.restaurant.name,
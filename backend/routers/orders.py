@@ -1,10 +1,11 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query
 from database.models import Order, OrderItem, Menu, OrderStatus
 from sqlmodel import Session,select
 from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
 import json
 import os
-import shutil
 from sqlalchemy.orm import selectinload
 
 from database.database import get_session
@@ -20,10 +21,18 @@ from crud.orders_crud import (
     create_order as db_create_order,
     get_order_with_details,
     get_user_orders as db_get_user_orders,
-    update_order_status,
-    generate_order_bill
+    generate_order_bill,
+    create_orders_bulk
 )
+from crud.pagination import InvalidCursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from crud.order_summaries import get_user_order_summaries, get_restaurant_order_summaries, decode_items_digest
 from crud.delivery_crud import assign_delivery_partner
+from crud.order_state import transition_order
+from services.uploads import store_upload, UploadTooLarge
+from services.image_variants import image_url
+from routers.schemas import or_error, UserOrdersPage, RestaurantOrdersPage
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.database import get_async_session
 from logger_config import get_logger
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
@@ -44,11 +53,7 @@ def create_order(
         items_data = json.loads(items)
         
         # Handle attachment
-        file_path = None
-        if attachment:
-            file_path = os.path.join(UPLOAD_DIRECTORY, f"u{user_id}_r{restaurant_id}_{attachment.filename}")
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(attachment.file, buffer)
+        file_path = store_upload(attachment, UPLOAD_DIRECTORY)
 
         # Call your CRUD function
         order = db_create_order(
@@ -64,76 +69,110 @@ def create_order(
 
         return {"status": "success", "order_id": order.id, "total_amount": order.total_amount}
 
+    except UploadTooLarge as e:
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error(f"Order creation failed: {str(e)}")
         return {"status": "error", "message": "Internal server error"}
 
-@router.get("/user/{user_id}/orders")
-def get_user_orders(
+MAX_BULK_ORDERS = 1000
+
+
+class BulkOrderItem(BaseModel):
+    menu_id: int
+    quantity: int = Field(gt=0)
+
+
+class BulkOrder(BaseModel):
+    user_id: int
+    restaurant_id: int
+    items: List[BulkOrderItem] = Field(min_length=1)
+    external_id: Optional[str] = None  # partner's own order reference, echoed back
+
+
+class BulkOrderRequest(BaseModel):
+    orders: List[BulkOrder] = Field(min_length=1, max_length=MAX_BULK_ORDERS)
+
+
+@router.post("/bulk")
+def create_orders_in_bulk(payload: BulkOrderRequest, session: Session = Depends(get_session)):
+    """Partner ingestion: many orders per call, per-order results in input order"""
+    logger.info("Bulk order ingestion | orders=%s", len(payload.orders))
+
+    try:
+        results = create_orders_bulk(
+            session,
+            [order.model_dump() for order in payload.orders]
+        )
+        for order, result in zip(payload.orders, results):
+            result["external_id"] = order.external_id
+
+        created = sum(1 for result in results if result["status"] == "success")
+        logger.info("Bulk order ingestion done | created=%s | failed=%s", created, len(results) - created)
+        return {
+            "status": "success",
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        }
+
+    except Exception as e:
+        logger.error("Bulk order ingestion failed | error=%s", str(e), exc_info=True)
+        return {"status": "error", "message": "Internal server error"}
+
+def summary_items(summary, base_url: str) -> list:
+    """Order lines from the summary's items digest, with thumbnail URLs"""
+    items = decode_items_digest(summary.items_digest)
+    for item in items:
+        item["menu_item_pic"] = image_url(item["menu_item_pic"], "thumb", base_url)
+    return items
+
+
+@router.get("/user/{user_id}/orders", response_model=or_error(UserOrdersPage))
+async def get_user_orders(
     user_id: int,
-    session: Session = Depends(get_session)
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    status: Optional[List[OrderStatus]] = Query(default=None),
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_async_session)
 ):
     BASE_URL = "http://127.0.0.1:8000"
 
-    stmt = (
-        select(Order)
-        .where(Order.user_id == user_id)
-        .options(
-            selectinload(Order.restaurant),
-            selectinload(Order.items).selectinload(OrderItem.menu)
+    try:
+        summaries, next_cursor = await get_user_order_summaries(
+            session, user_id, cursor, limit, status, from_date, to_date
         )
-        .order_by(Order.created_at.desc())
-    )
-
-    orders = session.exec(stmt).all()
+    except InvalidCursor:
+        return {"status": "error", "message": "Invalid cursor"}
 
     response = []
-    for o in orders:
-
-    # ✅ ORDER IMAGE
-        order_image = None
-        if o.items and o.items[0].menu and o.items[0].menu.menu_item_pic:
-            order_image = f"{BASE_URL}/{o.items[0].menu.menu_item_pic}"
-
+    for s in summaries:
         response.append({
-            "order_id": o.id,
-            "status": o.status,
-            "total_amount": o.total_amount,
+            "order_id": s.order_id,
+            "status": s.status,
+            "total_amount": s.total_amount,
 
-            "created_at": o.created_at.isoformat(),
-            "date": o.created_at.isoformat(),
+            "created_at": s.created_at.isoformat(),
+            "date": s.created_at.isoformat(),
 
-            "order_image": order_image,
+            "order_image": image_url(s.first_item_pic, "small", BASE_URL) if s.first_item_pic else None,
 
             "restaurant": {
-                "id": o.restaurant.id,
-                "name": o.restaurant.name,
-                "address": o.restaurant.address
+                "id": s.restaurant_id,
+                "name": s.restaurant_name,
+                "address": s.restaurant_address
             },
 
-            "items": [
-                {
-                    "menu_id": item.menu.id,
-                    "menu_item_name": item.menu.name,
-                    "quantity": item.quantity,
-                    "menu_item_pic": (
-                        f"{BASE_URL}/{item.menu.menu_item_pic}"
-                        if item.menu.menu_item_pic
-                        else None
-                    )
-                }
-                for item in o.items
-            ]
+            "items": summary_items(s, BASE_URL)
         })
 
-
-        
-
-
-
     return {
         "status": "success",
-        "orders": response
+        "orders": response,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
     }
 
 
@@ -151,73 +190,72 @@ def get_bill(order_id: int, session: Session = Depends(get_session)):
         "bill": bill_data
     }
 
-@router.get("/restaurant/{restaurant_id}")
+@router.get("/restaurant/{restaurant_id}", response_model=or_error(RestaurantOrdersPage))
 def get_restaurant_orders(
     restaurant_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    status: Optional[List[OrderStatus]] = Query(default=None),
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
     session: Session = Depends(get_session)
 ):
     BASE_URL = "http://127.0.0.1:8000"
 
-    stmt = (
-        select(Order)
-        .where(Order.restaurant_id == restaurant_id)
-        .options(
-            selectinload(Order.user),
-            selectinload(Order.items).selectinload(OrderItem.menu)
+    try:
+        summaries, next_cursor = get_restaurant_order_summaries(
+            session, restaurant_id, cursor, limit, status, from_date, to_date
         )
-        .order_by(Order.created_at.desc())
-    )
-
-    orders = session.exec(stmt).all()
+    except InvalidCursor:
+        return {"status": "error", "message": "Invalid cursor"}
 
     formatted_orders = []
-    for o in orders:
-
-    # ✅ ORDER IMAGE
-        order_image = None
-        if o.items and o.items[0].menu and o.items[0].menu.menu_item_pic:
-            order_image = f"{BASE_URL}/{o.items[0].menu.menu_item_pic}"
-
+    for s in summaries:
         formatted_orders.append({
-            "order_id": o.id,
-            "status": o.status,
-            "total_amount": o.total_amount,
+            "order_id": s.order_id,
+            "status": s.status,
+            "total_amount": s.total_amount,
 
-            "created_at": o.created_at.isoformat(),
-            "date": o.created_at.isoformat(),   # ✅ ADDED
+            "created_at": s.created_at.isoformat(),
+            "date": s.created_at.isoformat(),
 
-            "order_image": order_image,         # ✅ ADDED
+            "order_image": image_url(s.first_item_pic, "small", BASE_URL) if s.first_item_pic else None,
 
             "user": {
-                "id": o.user_id,
-                "name": o.user.name if o.user else "Guest"
+                "id": s.user_id,
+                "name": s.user_name or "Guest"
             },
 
-            "items": [
-                {
-                    "menu_id": item.menu.id,
-                    "menu_item_name": item.menu.name,
-                    "quantity": item.quantity,
-                    "menu_item_pic": (
-                        f"{BASE_URL}/{item.menu.menu_item_pic}"
-                        if item.menu.menu_item_pic
-                        else None
-                    )
-                }
-                for item in o.items
-            ]
+            "items": summary_items(s, BASE_URL)
         })
 
-    return {"status": "success", "orders": formatted_orders}
+    return {
+        "status": "success",
+        "orders": formatted_orders,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None
+    }
 
 
 @router.put("/{order_id}/status")
-def update_status(order_id: int, status: str, session: Session = Depends(get_session)):
-    """Updates order status: PLACED -> PREPARING -> OUT_FOR_DELIVERY -> DELIVERED"""
-    order = update_order_status(session, order_id, status.upper())
-    if not order:
-        return {"status": "error", "message": "Order not found"}
-    return {"status": "success", "new_status": order.status}
+def update_status(
+    order_id: int,
+    status: str,
+    expected_status: Optional[str] = None,
+    session: Session = Depends(get_session)
+):
+    """
+    Updates order status: PLACED -> PREPARING -> OUT_FOR_DELIVERY -> DELIVERED
+    (PLACED / PREPARING -> CANCELLED). Pass expected_status, the status the
+    client last saw, to have the change rejected if the order moved since.
+    """
+    result = transition_order(session, order_id, status, expected_status)
+    if not result.ok:
+        response = {"status": "error", "reason": result.reason, "message": result.message()}
+        if result.current_status:
+            response["current_status"] = result.current_status
+        return response
+    return {"status": "success", "previous_status": result.from_status, "new_status": result.to_status}
 
 @router.post("/{order_id}/assign/{partner_id}")
 def assign_partner(order_id: int, partner_id: int, session: Session = Depends(get_session)):
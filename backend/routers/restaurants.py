@@ -2,15 +2,27 @@ from fastapi import APIRouter, Form, File, UploadFile, Depends
 from pydantic import EmailStr
 from crud.restaurant_crud import (
     create_restaurant,
-    verify_restaurant,
     update_restaurant as update_restaurant_db,
     delete_restaurant as delete_restaurant_db,
     get_restaurant,
     get_all_restaurants
 )
 from logger_config import get_logger
-from database.database import get_session
+from database.database import get_session, get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from crud.async_users_crud import authenticate_account
+from services.tokens import token_service
+from services.passwords import login_metrics, PasswordHasherBusy
+from services.uploads import store_image_upload, UploadTooLarge
+from routers.schemas import (
+    or_error,
+    RestaurantLoginResponse,
+    RestaurantResponse,
+    RestaurantUpdateResponse,
+    RestaurantListResponse
+)
 import os
+import time
 from sqlmodel import Session
 
 router = APIRouter(prefix="/restaurants", tags=["Restaurants"])
@@ -33,13 +45,9 @@ def register_restaurant(
     logger.info("Restaurant registration started | email=%s", email)
 
     try:
-        pic_path = None
-
-        if restaurant_pic:
-            logger.info("Uploading restaurant image for %s", email)
-            pic_path = f"{RESTAURANT_UPLOAD_DIR}/{email}_{restaurant_pic.filename}"
-            with open(pic_path, "wb") as f:
-                f.write(restaurant_pic.file.read())
+        pic_path = store_image_upload(restaurant_pic, RESTAURANT_UPLOAD_DIR)
+        if pic_path:
+            logger.info("Uploaded restaurant image for %s", email)
         restaurant = create_restaurant(
             session=session,
             data={
@@ -60,41 +68,47 @@ def register_restaurant(
             "restaurant_id": restaurant.id
         }
 
+    except UploadTooLarge as e:
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error("Restaurant registration failed | email=%s | error=%s", email, str(e), exc_info=True)
         return {"status": "error", "message": "Internal error"}
-@router.post("/login")
-def login_restaurant(
+@router.post("/login", response_model=or_error(RestaurantLoginResponse))
+async def login_restaurant(
     email: EmailStr = Form(...),
     password: str = Form(...),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     logger.info("Restaurant login attempt | email=%s", email)
+    start = time.perf_counter()
 
     try:
-        success, restaurant = verify_restaurant(
-            session,
-            email=email,
-            password=password
-        )
+        restaurant = await authenticate_account(session, email, password, "restaurant")
 
-        if not success:
+        if not restaurant:
+            login_metrics.observe("restaurant", "failed", time.perf_counter() - start)
             logger.info("Login failed | invalid credentials | email=%s", email)
             return {"status": "error", "message": "Invalid email or password"}
 
+        login_metrics.observe("restaurant", "success", time.perf_counter() - start)
         logger.info("Login successful | restaurant_id=%s", restaurant.id)
 
         return {
             "status": "success",
             "message": "Login successful",
             "role": "restaurant",
-            "restaurant": restaurant
+            "restaurant": restaurant,
+            **token_service.login_payload(restaurant.id, "restaurant")
         }
 
+    except PasswordHasherBusy as e:
+        login_metrics.observe("restaurant", "busy", time.perf_counter() - start)
+        logger.warning("Login rejected, password pool busy | email=%s", email)
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error("Login error | email=%s | error=%s", email, str(e), exc_info=True)
         return {"status": "error", "message": "Internal error"}
-@router.put("/{restaurant_id}/update")
+@router.put("/{restaurant_id}/update", response_model=or_error(RestaurantUpdateResponse))
 def update_restaurant(
     restaurant_id: int,
     address: str = Form(None),
@@ -115,11 +129,9 @@ def update_restaurant(
         if password:
             update_data["password"] = password
 
-        if restaurant_pic:
+        pic_path = store_image_upload(restaurant_pic, RESTAURANT_UPLOAD_DIR)
+        if pic_path:
             logger.info("Updating restaurant image | restaurant_id=%s", restaurant_id)
-            pic_path = f"{RESTAURANT_UPLOAD_DIR}/{restaurant_id}_{restaurant_pic.filename}"
-            with open(pic_path, "wb") as f:
-                f.write(restaurant_pic.file.read())
             update_data["restaurant_pic"] = pic_path
 
         restaurant = update_restaurant_db(
@@ -142,11 +154,13 @@ def update_restaurant(
 
 
 
+    except UploadTooLarge as e:
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error("Update failed | restaurant_id=%s | error=%s", restaurant_id, str(e), exc_info=True)
         return {"status": "error", "message": "Internal error"}
 
-@router.get("/{restaurant_id}")
+@router.get("/{restaurant_id}", response_model=or_error(RestaurantResponse))
 def get_single_restaurant(restaurant_id: int, session: Session = Depends(get_session)):
     logger.info("Fetch single restaurant | restaurant_id=%s", restaurant_id)
 
@@ -167,7 +181,7 @@ def get_single_restaurant(restaurant_id: int, session: Session = Depends(get_ses
         logger.error("Fetch restaurant error | restaurant_id=%s | error=%s", restaurant_id, str(e), exc_info=True)
         return {"status": "error", "message": "Internal error"}
 
-@router.get("/")
+@router.get("/", response_model=or_error(RestaurantListResponse))
 def fetch_all_restaurants(session: Session = Depends(get_session)):
     logger.info("Fetching all restaurants")
 
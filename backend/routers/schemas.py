@@ -0,0 +1,153 @@
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from database.models import OrderStatus
+
+# Typed response models for the hot endpoints. FastAPI validates and
+# serializes these in pydantic-core instead of walking the payload with
+# jsonable_encoder, and only the declared fields reach the client, so ORM
+# objects returned by a route never leak columns such as password.
+
+
+class ResponseModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ErrorResponse(ResponseModel):
+    status: Literal["error"]
+    message: str
+
+
+def or_error(model):
+    """Success model or the {"status": "error", "message": ...} every route returns on failure"""
+    return Annotated[Union[model, ErrorResponse], Field(discriminator="status")]
+
+
+# --- Accounts ---
+
+class UserOut(ResponseModel):
+    id: int
+    name: str
+    email: str
+    mobile: str
+    address: Optional[str] = None
+    profile_picture: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class RestaurantOut(ResponseModel):
+    id: int
+    name: str
+    address: str
+    email: str
+    mobile: str
+    restaurant_pic: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class DeliveryPartnerOut(ResponseModel):
+    id: int
+    name: str
+    email: str
+    mobile: str
+    vehicle: str
+    address: str
+    profile_picture: Optional[str] = None
+    is_available: bool
+
+
+class UserResponse(ResponseModel):
+    status: Literal["success"]
+    message: str
+    user: UserOut
+
+
+class UserLoginResponse(UserResponse):
+    role: str
+    access_token: str
+    token_type: str
+    expires_in: int
+
+
+class RestaurantResponse(ResponseModel):
+    status: Literal["success"]
+    restaurant: RestaurantOut
+
+
+class RestaurantUpdateResponse(RestaurantResponse):
+    message: str
+
+
+class RestaurantLoginResponse(RestaurantUpdateResponse):
+    role: str
+    access_token: str
+    token_type: str
+    expires_in: int
+
+
+class DeliveryLoginResponse(ResponseModel):
+    status: Literal["success"]
+    message: str
+    delivery_partner: DeliveryPartnerOut
+    access_token: str
+    token_type: str
+    expires_in: int
+
+
+class RestaurantListResponse(ResponseModel):
+    status: Literal["success"]
+    restaurants: List[RestaurantOut]
+
+
+# --- Order history ---
+
+class OrderLineOut(ResponseModel):
+    menu_id: int
+    menu_item_name: str
+    quantity: int
+    menu_item_pic: Optional[str] = None
+
+
+class OrderRestaurantOut(ResponseModel):
+    id: int
+    name: str
+    address: str
+
+
+class OrderUserOut(ResponseModel):
+    id: int
+    name: str
+
+
+class OrderSummaryBase(ResponseModel):
+    order_id: int
+    status: OrderStatus
+    total_amount: float
+    created_at: str
+    date: str
+    order_image: Optional[str] = None
+    items: List[OrderLineOut]
+
+
+class UserOrderOut(OrderSummaryBase):
+    restaurant: OrderRestaurantOut
+
+
+class RestaurantOrderOut(OrderSummaryBase):
+    user: OrderUserOut
+
+
+class UserOrdersPage(ResponseModel):
+    status: Literal["success"]
+    orders: List[UserOrderOut]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+
+class RestaurantOrdersPage(ResponseModel):
+    status: Literal["success"]
+    orders: List[RestaurantOrderOut]
+    next_cursor: Optional[str] = None
+    has_more: bool
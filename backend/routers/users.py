@@ -5,14 +5,19 @@ from crud.users_crud import (
     check_user_exists,
     create_user,
     get_user,
-    verify_user,
-    get_all_users,
     update_user,
     delete_user
 )
 from logger_config import get_logger
-import os, shutil, re
-from database.database import get_session
+import os, re, time
+from database.database import get_session, get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from crud.async_users_crud import authenticate_account, ACCOUNT_MODELS
+from crud.projections import list_users
+from routers.schemas import or_error, UserResponse, UserLoginResponse
+from services.tokens import token_service
+from services.passwords import login_metrics, PasswordHasherBusy
+from services.uploads import store_image_upload, UploadTooLarge
 from sqlmodel import Session
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -21,7 +26,7 @@ logger = get_logger("UsersAPI")
 UPLOAD_DIR = "uploads/profile_pictures"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-@router.post("/register")
+@router.post("/register", response_model=or_error(UserResponse))
 def register_user(
     name: str = Form(...),
     email: EmailStr = Form(...),
@@ -45,11 +50,8 @@ def register_user(
             logger.error("Weak password | email=%s", email)
             return {"status": "error", "message": "Weak password"}
 
-        file_path = None
-        if profile_picture and profile_picture.filename:
-            file_path = f"{UPLOAD_DIR}/{email}_{profile_picture.filename}"
-            with open(file_path, "wb") as f:
-                shutil.copyfileobj(profile_picture.file, f)
+        file_path = store_image_upload(profile_picture, UPLOAD_DIR)
+        if file_path:
             logger.info("Profile picture saved | email=%s", email)
 
         user_data = {
@@ -75,47 +77,52 @@ def register_user(
             "user": user
         }
 
+    except UploadTooLarge as e:
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error("User registration failed | error=%s", str(e), exc_info=True)
         return {"status": "error", "message": "Internal error"}
 
-@router.post("/login")
-def login_user(
+@router.post("/login", response_model=or_error(UserLoginResponse))
+async def login_user(
     email: EmailStr = Form(...),
     password: str = Form(...),
     role: str = Form(...),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     logger.info("Login attempt | email=%s | role=%s", email, role)
+    start = time.perf_counter()
 
     try:
-        user_exist, user = verify_user(
-            session=session,
-            email=email,
-            password=password,
-            role=role
-        )
+        user = await authenticate_account(session, email, password, role)
 
-        if user_exist:
+        if user:
+            login_metrics.observe(role, "success", time.perf_counter() - start)
             logger.info("Login successful | user_id=%s", user.id)
             return {
                 "status": "success",
                 "message": "Login successful",
                 "user": user,
-                "role": role
+                "role": role,
+                **token_service.login_payload(user.id, role if role in ACCOUNT_MODELS else "user")
             }
 
+        login_metrics.observe(role, "failed", time.perf_counter() - start)
         logger.info("Login failed | email=%s | role=%s", email, role)
         return {
             "status": "error",
             "message": f"Account not found in {role} records."
         }
 
+    except PasswordHasherBusy as e:
+        login_metrics.observe(role, "busy", time.perf_counter() - start)
+        logger.warning("Login rejected, password pool busy | email=%s", email)
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error("Login error | email=%s | error=%s", email, str(e), exc_info=True)
         return {"status": "error", "message": "Internal error"}
 
-@router.put("/update/{user_id}")
+@router.put("/update/{user_id}", response_model=or_error(UserResponse))
 def update_user_api(
     user_id: int,
     name: str = Form(None),
@@ -149,10 +156,8 @@ def update_user_api(
                 return {"status": "error", "message": "Weak password"}
             update_data["password"] = password
 
-        if profile_picture:
-            file_path = f"{UPLOAD_DIR}/{user_id}_{profile_picture.filename}"
-            with open(file_path, "wb") as f:
-                shutil.copyfileobj(profile_picture.file, f)
+        file_path = store_image_upload(profile_picture, UPLOAD_DIR)
+        if file_path:
             update_data["profile_picture"] = file_path
             logger.info("Profile picture updated | user_id=%s", user_id)
 
@@ -170,6 +175,8 @@ def update_user_api(
             "user": user
         }
 
+    except UploadTooLarge as e:
+        return {"status": "error", "message": str(e)}
     except Exception as e:
         logger.error(
             "User update failed | user_id=%s | error=%s",
@@ -180,28 +187,17 @@ def update_user_api(
         return {"status": "error", "message": "Internal error"}
 
 @router.get("/")
-def get_users():
+def get_users(session: Session = Depends(get_session)):
     logger.info("Fetching all users")
 
     try:
-        session = get_session()
-        users = get_all_users(session)
+        users = list_users(session)
 
         logger.info("Users fetched successfully | count=%s", len(users))
 
         return {
             "status": "success",
-            "users": [
-                {
-                    "id": user.id,
-                    "name": user.name,
-                    "email": user.email,
-                    "mobile": user.mobile,
-                    "address": user.address,
-                    "profile_picture": user.profile_picture
-                }
-                for user in users
-            ]
+            "users": users
         }
 
     except Exception as e:
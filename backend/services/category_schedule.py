@@ -0,0 +1,32 @@
+from datetime import datetime, time
+
+from sqlalchemy import and_, or_
+
+from database.models import Category
+
+
+def current_minute() -> time:
+    """Server time truncated to the minute; availability is decided per minute"""
+    return datetime.now().time().replace(second=0, microsecond=0)
+
+
+def is_time_in_window(start_time: time, end_time: time, now: time) -> bool:
+    """True if now is inside [start, end]; windows like 22:00-02:00 cross midnight"""
+    if start_time <= end_time:
+        return start_time <= now <= end_time
+    return now >= start_time or now <= end_time
+
+
+def category_open_clause(now: time):
+    """SQL version of is_time_in_window, written so ix_categories_window can serve it"""
+    return or_(
+        and_(
+            Category.start_time <= now,
+            Category.end_time >= now,
+            Category.start_time <= Category.end_time
+        ),
+        and_(
+            Category.start_time > Category.end_time,
+            or_(Category.start_time <= now, Category.end_time >= now)
+        )
+    )
@@ -0,0 +1,167 @@
+import gzip
+import os
+from typing import Optional
+
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+
+# brotli is optional: without it only gzip is negotiated
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Bodies smaller than this go out as they are; headers would eat the saving
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Per-response levels: cheap enough to run on every request
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+# Levels for bodies compressed once and cached (menus)
+GZIP_STATIC_LEVEL = int(os.getenv("GZIP_STATIC_LEVEL", "9"))
+BROTLI_STATIC_QUALITY = int(os.getenv("BROTLI_STATIC_QUALITY", "9"))
+# Larger bodies are compressed in a worker thread so the event loop keeps serving
+COMPRESSION_THREAD_THRESHOLD = int(os.getenv("COMPRESSION_THREAD_THRESHOLD", str(64 * 1024)))
+
+# Server preference when the client accepts several with the same q-value
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# Streamed event feeds must reach the client as they are written
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported encoding for an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, static: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_STATIC_QUALITY if static else BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime=0 keeps the output stable, so equal bodies compress to equal bytes
+        return gzip.compress(body, compresslevel=GZIP_STATIC_LEVEL if static else GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Each encoding is its own representation, so it needs its own strong validator"""
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(UNCOMPRESSIBLE_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip / brotli for complete response bodies of at least
+    `minimum_size` bytes. Non-compressible content types, streaming
+    responses (SSE, file downloads, pathsend) and responses that already
+    carry a Content-Encoding pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending_start = None
+
+        async def send_compressed(message):
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                start_headers = Headers(raw=message.get("headers", []))
+                if not is_compressible(start_headers.get("content-type", "")) or "content-encoding" in start_headers:
+                    await send(message)
+                    return
+                # Hold the headers until the first body chunk shows whether it is worth compressing
+                pending_start = message
+                return
+            if pending_start is None:
+                await send(message)
+                return
+            if message["type"] != "http.response.body":
+                # pathsend / zerocopysend carry no body to compress; release the headers as they are
+                start, pending_start = pending_start, None
+                await send(start)
+                await send(message)
+                return
+
+            start, pending_start = pending_start, None
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            body = message.get("body", b"")
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+
+            if (
+                message.get("more_body", False)
+                or start["status"] < 200
+                or start["status"] in (204, 304)
+                or len(body) < self.minimum_size
+            ):
+                await send({**start, "headers": headers.raw})
+                await send(message)
+                return
+
+            if len(body) >= COMPRESSION_THREAD_THRESHOLD:
+                compressed = await to_thread.run_sync(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+
+            if len(compressed) >= len(body):
+                await send({**start, "headers": headers.raw})
+                await send(message)
+                return
+
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            if "etag" in headers:
+                headers["etag"] = encoded_etag(headers["etag"], encoding)
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import threading
+from datetime import datetime
+from typing import List
+
+from sqlmodel import Session
+
+from crud.order_summaries import event_snapshots
+from crud.delivery_crud import (
+    claim_order_for_partner,
+    get_dispatchable_order_ids,
+    CLAIM_ASSIGNED,
+    CLAIM_PARTNER_UNAVAILABLE
+)
+from database.models import Order
+from services.order_events import publish_order_event
+from services.partner_index import partner_index, PartnerSlot
+from logger_config import get_logger
+
+logger = get_logger("Dispatch")
+
+DISPATCH_POLICY = os.getenv("DISPATCH_POLICY", "least_recent")
+DISPATCH_BATCH_SIZE = int(os.getenv("DISPATCH_BATCH_SIZE", "50"))
+# 0 disables the background dispatcher; POST /delivery/dispatch still works
+DISPATCH_INTERVAL_SECONDS = float(os.getenv("DISPATCH_INTERVAL_SECONDS", "0"))
+
+
+class RoundRobinPolicy:
+    """Walk the partner ids in order, continuing after the last one picked"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_id = 0
+
+    def choose(self, candidates: List[PartnerSlot]) -> PartnerSlot:
+        with self._lock:
+            after = [slot for slot in candidates if slot.partner_id > self._last_id]
+            chosen = min(after or candidates, key=lambda slot: slot.partner_id)
+            self._last_id = chosen.partner_id
+            return chosen
+
+
+class LeastRecentPolicy:
+    """The partner who has waited longest since their last order"""
+
+    def choose(self, candidates: List[PartnerSlot]) -> PartnerSlot:
+        return min(candidates, key=lambda slot: (slot.last_assigned_at or datetime.min, slot.partner_id))
+
+
+class LoadBalancedPolicy:
+    """The partner with the fewest orders so far"""
+
+    def choose(self, candidates: List[PartnerSlot]) -> PartnerSlot:
+        return min(candidates, key=lambda slot: (slot.assigned_count, slot.partner_id))
+
+
+DISPATCH_POLICIES = {
+    "round_robin": RoundRobinPolicy(),
+    "least_recent": LeastRecentPolicy(),
+    "load_balanced": LoadBalancedPolicy(),
+}
+
+
+def register_policy(name: str, policy):
+    """Add a policy: any object with choose(candidates) -> PartnerSlot"""
+    DISPATCH_POLICIES[name] = policy
+
+
+def get_policy(name: str):
+    policy = DISPATCH_POLICIES.get(name)
+    if policy is None:
+        raise ValueError(f"Unknown dispatch policy '{name}'")
+    return policy
+
+
+def dispatch_pending_orders(session: Session, policy_name: str = DISPATCH_POLICY, limit: int = DISPATCH_BATCH_SIZE) -> dict:
+    """
+    Assign up to `limit` waiting orders (oldest first) to free partners.
+
+    Candidates come from the in-memory partner index and are ranked by the
+    policy; each assignment is an atomic claim, so a partner taken by another
+    worker in the meantime is simply skipped.
+    """
+    policy = get_policy(policy_name)
+    order_ids = get_dispatchable_order_ids(session, limit)
+    candidates = partner_index.available(session) if order_ids else []
+    assigned = []
+    for order_id in order_ids:
+        if not candidates:
+            break
+        while candidates:
+            slot = policy.choose(candidates)
+            outcome = claim_order_for_partner(session, order_id, slot.partner_id)
+            if outcome == CLAIM_ASSIGNED:
+                candidates.remove(slot)
+                assigned.append({"order_id": order_id, "partner_id": slot.partner_id})
+                break
+            if outcome == CLAIM_PARTNER_UNAVAILABLE:
+                # The index was stale; the partner went busy elsewhere
+                partner_index.mark_busy(slot.partner_id)
+                candidates.remove(slot)
+                continue
+            # Order was assigned or cancelled elsewhere; the partner is still free
+            break
+
+    snapshots = event_snapshots(session, [assignment["order_id"] for assignment in assigned])
+    for assignment in assigned:
+        order_id = assignment["order_id"]
+        publish_order_event(session.get(Order, order_id), "order_assigned", snapshots.get(order_id))
+
+    return {"assigned": assigned, "unassigned": len(order_ids) - len(assigned)}
+
+
+async def run_dispatcher(engine, interval: float = DISPATCH_INTERVAL_SECONDS, policy_name: str = DISPATCH_POLICY):
+    """Background loop: dispatch a batch every `interval` seconds"""
+    def dispatch_once():
+        with Session(engine) as session:
+            return dispatch_pending_orders(session, policy_name)
+
+    logger.info("Dispatcher started (policy=%s, every %ss)", policy_name, interval)
+    while True:
+        try:
+            result = await asyncio.to_thread(dispatch_once)
+            if result["assigned"]:
+                logger.info("Dispatched %s orders", len(result["assigned"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Dispatch run failed: %s", str(e), exc_info=True)
+        await asyncio.sleep(interval)
@@ -0,0 +1,148 @@
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from logger_config import get_logger
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it every size points at the original
+    Image = None
+
+logger = get_logger("ImageVariants")
+
+# name -> longest edge in pixels
+IMAGE_VARIANTS = {"thumb": 128, "small": 320, "medium": 800}
+IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp"}
+
+# uploads/menu_items/<hash>.jpg -> uploads/menu_items/<hash>.jpg.thumb.webp
+VARIANT_PATH_RE = re.compile(r"^(?P<original>.+)\.(?P<size>%s)\.webp$" % "|".join(IMAGE_VARIANTS))
+
+
+def variants_enabled() -> bool:
+    return Image is not None
+
+
+def is_image_path(path: Optional[str]) -> bool:
+    return bool(path) and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+
+def variant_path(path: str, size: str) -> str:
+    return f"{path}.{size}.webp"
+
+
+def original_path(path: str) -> Optional[str]:
+    """Original image behind a variant path, or None if path is not a variant"""
+    match = VARIANT_PATH_RE.match(path)
+    return match.group("original") if match else None
+
+
+def image_url(path: Optional[str], size: Optional[str] = None, base_url: str = "") -> Optional[str]:
+    """
+    URL of an upload at the given size. Variant URLs are stable from the
+    moment of upload; until the worker has written the file, the static
+    handler answers them with the original.
+    """
+    if not path:
+        return None
+    if size and variants_enabled() and is_image_path(path):
+        path = variant_path(path, size)
+    return f"{base_url}/{path}" if base_url else path
+
+
+def image_urls(path: Optional[str], base_url: str = "") -> Optional[dict]:
+    """{"original": ..., "thumb": ..., "small": ..., "medium": ...} for an upload"""
+    if not path:
+        return None
+    urls = {"original": image_url(path, base_url=base_url)}
+    for size in IMAGE_VARIANTS:
+        urls[size] = image_url(path, size, base_url)
+    return urls
+
+
+def generate_variants(path: str) -> list:
+    """Write the missing WebP variants of one image; returns the paths written"""
+    written = []
+    with Image.open(path) as source:
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ("RGB", "RGBA"):
+            source = source.convert("RGBA" if "transparency" in source.info else "RGB")
+        for size, edge in IMAGE_VARIANTS.items():
+            target = variant_path(path, size)
+            if os.path.exists(target):
+                continue
+            resized = source.copy()
+            resized.thumbnail((edge, edge))
+            # Write then rename, so the static handler never serves half a file
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    resized.save(out, "WEBP", quality=IMAGE_WEBP_QUALITY)
+                os.replace(temp_path, target)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            written.append(target)
+    return written
+
+
+class ImageVariantWorker:
+    """Generates variants on a small thread pool, outside the request that uploaded the image"""
+
+    def __init__(self, workers: int = IMAGE_WORKERS):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending: set = set()
+
+    def submit(self, path: Optional[str]):
+        if not variants_enabled() or not is_image_path(path):
+            return None
+        with self._lock:
+            if path in self._pending:
+                return None
+            self._pending.add(path)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="image-variants")
+            return self._executor.submit(self._run, path)
+
+    def _run(self, path: str):
+        try:
+            written = generate_variants(path)
+            if written:
+                logger.info("Generated %d variants for %s", len(written), path)
+            return written
+        except Exception as e:
+            logger.error("Variant generation failed for %s: %s", path, str(e))
+            return []
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def remove_image(path: Optional[str]):
+    """Delete an upload and its variants"""
+    if not path:
+        return
+    for target in [path, *(variant_path(path, size) for size in IMAGE_VARIANTS)]:
+        if os.path.exists(target):
+            os.remove(target)
+
+
+image_variants = ImageVariantWorker()
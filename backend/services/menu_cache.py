@@ -0,0 +1,130 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+from services.compression import compress, encoded_etag, COMPRESSION_MIN_SIZE
+
+MENU_CACHE_MAX_ENTRIES = int(os.getenv("MENU_CACHE_MAX_ENTRIES", "512"))
+MENU_CACHE_TTL_SECONDS = float(os.getenv("MENU_CACHE_TTL_SECONDS", "300"))
+
+
+@dataclass
+class CachedMenu:
+    version: int
+    expires_at: float
+    body: bytes
+    etag: str
+    # Compressed copies of body by content-coding, filled on first request for each
+    encodings: dict = field(default_factory=dict)
+
+    def has_encoding(self, encoding: Optional[str]) -> bool:
+        return encoding is None or len(self.body) < COMPRESSION_MIN_SIZE or encoding in self.encodings
+
+    def encoded(self, encoding: Optional[str]) -> Tuple[bytes, str]:
+        """(body, etag) for the negotiated encoding; None or a tiny body means identity"""
+        if encoding is None or len(self.body) < COMPRESSION_MIN_SIZE:
+            return self.body, self.etag
+        body = self.encodings.get(encoding)
+        if body is None:
+            body = self.encodings[encoding] = compress(self.body, encoding, static=True)
+        return body, encoded_etag(self.etag, encoding)
+
+
+class MenuCache:
+    """
+    Per-restaurant LRU of serialized menu payloads.
+
+    Every menu / category write bumps the restaurant's version, which makes
+    older entries unreachable. The TTL bounds staleness between worker
+    processes, since each worker keeps its own cache.
+    """
+
+    def __init__(self, max_entries: int = MENU_CACHE_MAX_ENTRIES, ttl_seconds: float = MENU_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, CachedMenu]" = OrderedDict()
+        self._versions: dict = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, restaurant_id: int) -> int:
+        with self._lock:
+            return self._versions.get(restaurant_id, 0)
+
+    def get(self, restaurant_id: int, category_id: Optional[int] = None) -> Optional[CachedMenu]:
+        key = (restaurant_id, category_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is None
+                or entry.version != self._versions.get(restaurant_id, 0)
+                or entry.expires_at < time.monotonic()
+            ):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, restaurant_id: int, category_id: Optional[int], version: int, body: bytes) -> CachedMenu:
+        """
+        Store a payload built from data read at `version`. If the menu changed
+        while it was being built, the entry is returned but not cached.
+        """
+        entry = CachedMenu(
+            version=version,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            body=body,
+            etag=f'"{restaurant_id}-{version}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        )
+        with self._lock:
+            if version != self._versions.get(restaurant_id, 0):
+                return entry
+            key = (restaurant_id, category_id)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, restaurant_id: int):
+        with self._lock:
+            self._versions[restaurant_id] = self._versions.get(restaurant_id, 0) + 1
+            for key in [k for k in self._entries if k[0] == restaurant_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check, accepting '*', lists and weak validators"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+menu_cache = MenuCache()
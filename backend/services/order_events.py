@@ -0,0 +1,117 @@
+import asyncio
+import itertools
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+ORDER_EVENTS_QUEUE_SIZE = int(os.getenv("ORDER_EVENTS_QUEUE_SIZE", "100"))
+
+CHANNEL_TYPES = ("restaurant", "user", "partner")
+
+
+def channel_name(channel_type: str, channel_id: int) -> str:
+    return f"{channel_type}:{channel_id}"
+
+
+class Subscription:
+    """One client connection: a bounded queue owned by the event loop that created it"""
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.channel = channel
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event: dict):
+        # Runs on the subscription's loop. A slow client loses its oldest
+        # events instead of growing memory or blocking publishers.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def next_event(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event (with a `missed` count if events were dropped), or None on timeout"""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if self.dropped:
+            event = {**event, "missed": self.dropped}
+            self.dropped = 0
+        return event
+
+
+class OrderEventBus:
+    """
+    In-process pub/sub for order changes, one channel per restaurant, user
+    and delivery partner. publish() is thread-safe so sync endpoints running
+    in the threadpool can call it. Each worker process has its own bus.
+    """
+
+    def __init__(self, queue_size: int = ORDER_EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: dict = {}
+        self._sequence = itertools.count(1)
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(channel, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, event: dict, channels):
+        event = {**event, "id": next(self._sequence)}
+        with self._lock:
+            targets = [sub for channel in channels for sub in self._subscribers.get(channel, ())]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # Loop already closed; the connection is going away
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+order_events = OrderEventBus()
+
+
+def publish_order_event(order, event_type: str = "order_status", snapshot: Optional[dict] = None):
+    """
+    Fan an order change out to its restaurant, customer and delivery partner
+    channels. snapshot, when given, is the whole order as the list endpoints
+    show it, so clients can add an order they have not seen without a fetch.
+    """
+    channels = [
+        channel_name("restaurant", order.restaurant_id),
+        channel_name("user", order.user_id),
+    ]
+    if order.delivery_partner_id:
+        channels.append(channel_name("partner", order.delivery_partner_id))
+
+    event = {
+        "type": event_type,
+        "order_id": order.id,
+        "status": order.status,
+        "restaurant_id": order.restaurant_id,
+        "user_id": order.user_id,
+        "delivery_partner_id": order.delivery_partner_id,
+        "total_amount": order.total_amount,
+        "at": datetime.utcnow().isoformat()
+    }
+    if snapshot is not None:
+        event["order"] = snapshot
+    order_events.publish(event, channels)
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from database.models import DeliveryPartner, Order
+
+# Other workers change availability too; reload from the database at least this often
+PARTNER_INDEX_TTL_SECONDS = float(os.getenv("PARTNER_INDEX_TTL_SECONDS", "30"))
+
+
+@dataclass
+class PartnerSlot:
+    partner_id: int
+    assigned_count: int = 0
+    last_assigned_at: Optional[datetime] = None
+
+
+class PartnerIndex:
+    """
+    In-memory view of which delivery partners are free, plus the per-partner
+    counters the dispatch policies rank by. Delivery writes in this process
+    update it directly. It is only a hint: the conditional UPDATE in
+    claim_order_for_partner has the final say.
+    """
+
+    def __init__(self, ttl_seconds: float = PARTNER_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._slots: dict = {}
+        self._available: set = set()
+        self._loaded_at: Optional[float] = None
+        self._generation = 0
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def load(self, session: Session):
+        with self._lock:
+            generation = self._generation
+
+        partners = session.exec(select(DeliveryPartner.id, DeliveryPartner.is_available)).all()
+        stats = session.exec(
+            select(Order.delivery_partner_id, func.count(Order.id), func.max(Order.created_at))
+            .where(Order.delivery_partner_id.is_not(None))
+            .group_by(Order.delivery_partner_id)
+        ).all()
+        counts = {partner_id: (count, last) for partner_id, count, last in stats}
+
+        slots = {}
+        for partner_id, _ in partners:
+            count, last = counts.get(partner_id, (0, None))
+            slots[partner_id] = PartnerSlot(partner_id, count, last)
+
+        with self._lock:
+            # A write landed while we were reading; keep the current view and retry next time
+            if generation != self._generation:
+                return
+            self._slots = slots
+            self._available = {partner_id for partner_id, available in partners if available}
+            self._loaded_at = time.monotonic()
+
+    def available(self, session: Session) -> List[PartnerSlot]:
+        """Copies of the free partners' slots, reloading if the index is stale"""
+        with self._lock:
+            fresh = self._is_fresh()
+        if not fresh:
+            self.load(session)
+        with self._lock:
+            return [PartnerSlot(**vars(self._slots[pid])) for pid in sorted(self._available)]
+
+    def mark_assigned(self, partner_id: int):
+        with self._lock:
+            self._generation += 1
+            slot = self._slots.setdefault(partner_id, PartnerSlot(partner_id))
+            slot.assigned_count += 1
+            slot.last_assigned_at = datetime.utcnow()
+            self._available.discard(partner_id)
+
+    def mark_busy(self, partner_id: int):
+        with self._lock:
+            self._generation += 1
+            self._available.discard(partner_id)
+
+    def mark_available(self, partner_id: int):
+        with self._lock:
+            self._generation += 1
+            self._slots.setdefault(partner_id, PartnerSlot(partner_id))
+            self._available.add(partner_id)
+
+    def remove(self, partner_id: int):
+        with self._lock:
+            self._generation += 1
+            self._slots.pop(partner_id, None)
+            self._available.discard(partner_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._loaded_at = None
+
+
+partner_index = PartnerIndex()
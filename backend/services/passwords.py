@@ -0,0 +1,206 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+try:
+    import bcrypt
+except ImportError:  # bcrypt is optional; scrypt from the stdlib is the default
+    bcrypt = None
+
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "scrypt")
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+
+# hashlib.scrypt and bcrypt release the GIL, so threads give real parallelism
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashes allowed to wait for a worker; past this, logins are turned away instead of piling up
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=32)
+
+
+def make_hash(password: str, scheme: str = PASSWORD_SCHEME) -> str:
+    """scrypt$n$r$p$salt$hash, or a $2b$ bcrypt hash"""
+    if scheme == "bcrypt":
+        if bcrypt is None:
+            raise RuntimeError("PASSWORD_SCHEME=bcrypt needs the bcrypt package")
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode("ascii")
+    salt = secrets.token_bytes(16)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def check_hash(password: str, stored: str) -> Tuple[bool, bool]:
+    """(matches, needs_rehash). Anything not in a known hash format is a legacy plain-text password."""
+    if stored.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, digest = stored.split("$")
+            n, r, p = int(n), int(r), int(p)
+            expected = base64.b64decode(digest)
+            candidate = _scrypt(password, base64.b64decode(salt), n, r, p)
+        except ValueError:
+            return False, False
+        outdated = PASSWORD_SCHEME != "scrypt" or (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return hmac.compare_digest(candidate, expected), outdated
+
+    if stored.startswith("$2") and bcrypt is not None:
+        matches = bcrypt.checkpw(password.encode(), stored.encode())
+        outdated = PASSWORD_SCHEME != "bcrypt" or int(stored.split("$")[2]) != BCRYPT_ROUNDS
+        return matches, outdated
+
+    return hmac.compare_digest(password.encode(), stored.encode()), True
+
+
+class LatencyWindow:
+    """Last `size` samples, for percentile reporting"""
+
+    def __init__(self, size: int = 1024):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds * 1000)
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            ordered = sorted(self._samples)
+            count = self.count
+        if not ordered:
+            return {"count": count}
+
+        def pct(q):
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+        return {"count": count, "p50_ms": pct(0.5), "p95_ms": pct(0.95), "p99_ms": pct(0.99)}
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords on a dedicated, bounded thread pool so a
+    login storm costs at most PASSWORD_HASH_WORKERS cores and never holds the
+    event loop or the request threadpool. When more than max_queue hashes are
+    waiting, new ones fail fast with PasswordHasherBusy.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.hash_latency = LatencyWindow()
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.hash_latency.observe(time.perf_counter() - start)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("Too many login attempts right now, please retry")
+        with self._lock:
+            self._in_flight += 1
+
+        def release(_):
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+        future = self._executor.submit(self._timed, fn, *args)
+        future.add_done_callback(release)
+        return future
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(make_hash, password))
+
+    async def verify(self, password: str, stored: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """(matches, new_hash): new_hash is set when the stored value should be replaced"""
+        if stored is None:
+            # Unknown account: burn the same work so timing doesn't reveal which emails exist
+            await asyncio.wrap_future(self._submit(check_hash, password, DUMMY_HASH))
+            return False, None
+        matches, outdated = await asyncio.wrap_future(self._submit(check_hash, password, stored))
+        if matches and outdated:
+            with self._lock:
+                self.rehashed += 1
+            return True, await self.hash(password)
+        return matches, None
+
+    def hash_sync(self, password: str) -> str:
+        """For sync endpoints (already on a worker thread); still goes through the bounded pool"""
+        return self._submit(make_hash, password).result()
+
+    def verify_sync(self, password: str, stored: str) -> Tuple[bool, Optional[str]]:
+        matches, outdated = self._submit(check_hash, password, stored).result()
+        if matches and outdated:
+            with self._lock:
+                self.rehashed += 1
+            return True, self.hash_sync(password)
+        return matches, None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            stats = {"rejected": self.rejected, "rehashed": self.rehashed}
+        return {
+            "scheme": PASSWORD_SCHEME,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "queue_depth": max(in_flight - self.workers, 0),
+            **stats,
+            "hash_latency": self.hash_latency.snapshot(),
+        }
+
+
+class LoginMetrics:
+    """End-to-end login latency per role, split by outcome"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def observe(self, role: str, outcome: str, seconds: float):
+        key = f"{role}:{outcome}"
+        with self._lock:
+            window = self._windows.setdefault(key, LatencyWindow())
+        window.observe(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            windows = dict(self._windows)
+        return {key: window.snapshot() for key, window in sorted(windows.items())}
+
+
+DUMMY_HASH = make_hash(secrets.token_hex(16), "scrypt")
+password_hasher = PasswordHasher()
+login_metrics = LoginMetrics()
@@ -0,0 +1,221 @@
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from logger_config import get_logger
+
+logger = get_logger("RequestMetrics")
+
+# A request running more statements than this is logged as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "20"))
+# ...as is one that repeats the same statement (ignoring parameters) this often
+N_PLUS_ONE_REPEAT_THRESHOLD = int(os.getenv("N_PLUS_ONE_REPEAT_THRESHOLD", "10"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "shapes")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.shapes = Counter()
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - started
+        stats.shapes[statement] += 1
+
+
+def instrument_engine(target_engine):
+    """Count statements and DB time per request; for an AsyncEngine pass .sync_engine"""
+    event.listen(target_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> list:
+        out = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += bucket_count
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        out.append(f"{name}_sum{{{labels}}} {self.total:.6f}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.n_plus_one = 0
+        self.status_counts = Counter()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats, flagged: bool):
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.latency.observe(seconds)
+            metrics.statements.observe(stats.statements)
+            metrics.db_seconds += stats.db_seconds
+            metrics.status_counts[status] += 1
+            if flagged:
+                metrics.n_plus_one += 1
+
+    def render(self, extra_lines=()) -> str:
+        """Prometheus text exposition format"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                "# HELP http_request_duration_seconds Request latency by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), metrics in routes:
+                lines += metrics.latency.lines("http_request_duration_seconds", f'method="{method}",route="{route}"')
+
+            lines += [
+                "# HELP http_request_db_statements SQL statements executed per request.",
+                "# TYPE http_request_db_statements histogram",
+            ]
+            for (method, route), metrics in routes:
+                lines += metrics.statements.lines("http_request_db_statements", f'method="{method}",route="{route}"')
+
+            lines += [
+                "# HELP http_request_db_seconds_total Time spent in SQL statements.",
+                "# TYPE http_request_db_seconds_total counter",
+            ]
+            for (method, route), metrics in routes:
+                lines.append(f'http_request_db_seconds_total{{method="{method}",route="{route}"}} {metrics.db_seconds:.6f}')
+
+            lines += [
+                "# HELP http_requests_total Requests by route and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.status_counts.items()):
+                    lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            lines += [
+                "# HELP http_requests_n_plus_one_total Requests flagged as likely N+1 query patterns.",
+                "# TYPE http_requests_n_plus_one_total counter",
+            ]
+            for (method, route), metrics in routes:
+                lines.append(f'http_requests_n_plus_one_total{{method="{method}",route="{route}"}} {metrics.n_plus_one}')
+
+        lines += list(extra_lines)
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+def route_label(scope) -> str:
+    """Route template (/orders/{order_id}/status) so label cardinality stays bounded"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("root_path"):
+        # Inside a mount such as /uploads
+        return f"{scope['root_path']}/{{path}}"
+    return "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """
+    Times each HTTP request and counts its SQL statements / DB time through
+    the engine hooks above. Adds a Server-Timing header, records everything
+    in `registry` for /metrics, and logs requests that look like N+1 queries.
+    """
+
+    def __init__(self, app, registry: "MetricsRegistry" = None):
+        self.app = app
+        self.registry = registry or metrics_registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        start = time.perf_counter()
+        status_holder = [500]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'app;dur={elapsed_ms:.1f}, db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries"'.encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_stats.reset(token)
+            elapsed = time.perf_counter() - start
+            method, route = scope["method"], route_label(scope)
+            repeated, repeat_count = stats.shapes.most_common(1)[0] if stats.shapes else ("", 0)
+            flagged = (stats.statements > N_PLUS_ONE_THRESHOLD
+                       or repeat_count > N_PLUS_ONE_REPEAT_THRESHOLD)
+            if flagged:
+                logger.warning(
+                    "Possible N+1 | %s %s | %d statements, %.1f ms in DB | repeated %dx: %s",
+                    method, route, stats.statements, stats.db_seconds * 1000,
+                    repeat_count, _WHITESPACE_RE.sub(" ", repeated)[:200]
+                )
+            self.registry.record(method, route, status_holder[0], elapsed, stats, flagged)
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,76 @@
+import os
+import re
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from services.image_variants import original_path, IMAGE_VARIANTS
+
+# Content-addressed uploads never change, so clients and CDNs may keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Older uploads are named after the client's filename and may be overwritten in place
+MUTABLE_CACHE_CONTROL = os.getenv("UPLOADS_MUTABLE_CACHE_CONTROL", "no-cache")
+# e.g. "/protected-uploads/": let nginx send the file (sendfile) via X-Accel-Redirect
+UPLOADS_ACCEL_REDIRECT = os.getenv("UPLOADS_ACCEL_REDIRECT", "")
+
+# <sha256 prefix>[.ext][.<size>.webp], as written by services.uploads / image_variants
+CONTENT_ADDRESSED_RE = re.compile(
+    r"^(?P<digest>[0-9a-f]{32})(?:\.[a-z0-9]{1,10})?(?:\.(?P<size>%s)\.webp)?$" % "|".join(IMAGE_VARIANTS)
+)
+
+
+def content_etag(filename: str):
+    """Strong ETag derived from the content hash in the name, or None for legacy names"""
+    match = CONTENT_ADDRESSED_RE.match(filename)
+    if not match:
+        return None
+    tag = match.group("digest")
+    if match.group("size"):
+        tag = f"{tag}-{match.group('size')}"
+    return f'"{tag}"'
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    StaticFiles for /uploads.
+
+    Content-addressed files get a strong ETag taken from their name and
+    Cache-Control: immutable. Range requests and zero-copy sends (where the
+    server supports http.response.pathsend) come from FileResponse. With
+    UPLOADS_ACCEL_REDIRECT set, the body is left to the front proxy. A
+    not-yet-generated image variant (<image>.<size>.webp) is answered with
+    the original, marked not cacheable so clients pick up the variant later.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        filename = os.path.basename(full_path)
+        etag = content_etag(filename)
+        headers = {"cache-control": IMMUTABLE_CACHE_CONTROL if etag else MUTABLE_CACHE_CONTROL}
+        if etag:
+            headers["etag"] = etag
+
+        response = FileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+
+        if UPLOADS_ACCEL_REDIRECT:
+            relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+            offloaded = Response(status_code=status_code, media_type=response.media_type)
+            for name in ("cache-control", "etag", "last-modified", "accept-ranges"):
+                offloaded.headers[name] = response.headers[name]
+            offloaded.headers["x-accel-redirect"] = f"{UPLOADS_ACCEL_REDIRECT.rstrip('/')}/{relative}"
+            return offloaded
+        return response
+
+    async def get_response(self, path, scope):
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            original = original_path(path)
+            if exc.status_code != 404 or original is None:
+                raise
+        response = await super().get_response(original, scope)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,173 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from logger_config import get_logger
+
+logger = get_logger("Tokens")
+
+TOKEN_SECRET = os.getenv("TOKEN_SECRET", "")
+TOKEN_TTL_SECONDS = int(os.getenv("TOKEN_TTL_SECONDS", str(12 * 3600)))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+if not TOKEN_SECRET:
+    # Tokens then only verify in this process and die with it; set TOKEN_SECRET in deployments
+    TOKEN_SECRET = secrets.token_urlsafe(32)
+    logger.warning("TOKEN_SECRET is not set; using a random per-process secret")
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    account_id: int
+    role: str
+    expires_at: int
+    token_id: str
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+class TokenService:
+    """
+    Issues and checks HS256 JWTs. Verification is an HMAC plus a JSON parse
+    and needs no database. Verified tokens are kept in an LRU so repeat
+    requests skip even that. Revocations are kept by token id until the
+    token would have expired anyway; a live revocation is never dropped.
+    """
+
+    def __init__(self, secret: str = TOKEN_SECRET, ttl_seconds: int = TOKEN_TTL_SECONDS, cache_size: int = TOKEN_CACHE_SIZE):
+        self._key = secret.encode()
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._verified: OrderedDict = OrderedDict()  # token -> TokenClaims
+        self._revoked: dict = {}                     # token id -> expires_at
+        self._revoked_prune_at = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _sign(self, signing_input: str) -> str:
+        return _b64encode(hmac.new(self._key, signing_input.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, account_id: int, role: str) -> str:
+        now = int(time.time())
+        payload = {
+            "sub": str(account_id),
+            "role": role,
+            "iat": now,
+            "exp": now + self.ttl_seconds,
+            "jti": secrets.token_urlsafe(12),
+        }
+        signing_input = f"{_HEADER}.{_b64encode(json.dumps(payload, separators=(',', ':')).encode())}"
+        return f"{signing_input}.{self._sign(signing_input)}"
+
+    def _decode(self, token: str) -> TokenClaims:
+        try:
+            header, payload, signature = token.split(".")
+        except ValueError:
+            raise InvalidToken("Malformed token")
+        if header != _HEADER or not hmac.compare_digest(signature, self._sign(f"{header}.{payload}")):
+            raise InvalidToken("Invalid token signature")
+        try:
+            data = json.loads(_b64decode(payload))
+            return TokenClaims(int(data["sub"]), data["role"], int(data["exp"]), data["jti"])
+        except (ValueError, KeyError, TypeError):
+            raise InvalidToken("Malformed token")
+
+    def verify(self, token: str) -> TokenClaims:
+        with self._lock:
+            claims = self._verified.get(token)
+            if claims is not None:
+                self._verified.move_to_end(token)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+        if claims is None:
+            claims = self._decode(token)
+            with self._lock:
+                self._verified[token] = claims
+                if len(self._verified) > self.cache_size:
+                    self._verified.popitem(last=False)
+
+        if claims.expires_at <= time.time():
+            raise InvalidToken("Token expired")
+        with self._lock:
+            if claims.token_id in self._revoked:
+                raise InvalidToken("Token revoked")
+        return claims
+
+    def _prune_revoked(self, now: float):
+        """Drop revocations of tokens that have expired; caller holds the lock"""
+        for token_id, expires_at in list(self._revoked.items()):
+            if expires_at <= now:
+                del self._revoked[token_id]
+        # Sweep again once the set has grown by as much as it holds now
+        self._revoked_prune_at = max(self.cache_size, 2 * len(self._revoked))
+
+    def revoke(self, claims: TokenClaims):
+        now = time.time()
+        if claims.expires_at <= now:
+            return
+        with self._lock:
+            self._revoked[claims.token_id] = claims.expires_at
+            if len(self._revoked) > self._revoked_prune_at:
+                self._prune_revoked(now)
+            for token, cached in list(self._verified.items()):
+                if cached.token_id == claims.token_id:
+                    del self._verified[token]
+
+    def login_payload(self, account_id: int, role: str) -> dict:
+        """Token fields added to the login responses"""
+        return {
+            "access_token": self.issue(account_id, role),
+            "token_type": "bearer",
+            "expires_in": self.ttl_seconds,
+        }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "verified_cached": len(self._verified),
+                "revoked": len(self._revoked),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+            }
+
+
+token_service = TokenService()
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_token_claims(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> TokenClaims:
+    """Dependency: claims of the request's bearer token, 401 otherwise. No database access."""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Missing bearer token", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return token_service.verify(credentials.credentials)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
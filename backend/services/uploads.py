@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from services.image_variants import image_variants
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Whole multipart request (file + form fields), checked from Content-Length before the body is read
+MAX_UPLOAD_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_REQUEST_BYTES", str(MAX_UPLOAD_BYTES + 1024 * 1024)))
+
+_EXTENSION_RE = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def upload_extension(filename: Optional[str]) -> str:
+    """Lower-cased extension of the client's filename, or "" if it looks unsafe"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extension if _EXTENSION_RE.match(extension) else ""
+
+
+def store_upload(upload: Optional[UploadFile], directory: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Optional[str]:
+    """
+    Copy an upload to `directory` in UPLOAD_CHUNK_SIZE chunks and return its
+    path, or None for a missing / empty file.
+
+    The data goes to a temp file in the same directory while being hashed,
+    then is renamed to <sha256><ext>, so readers never see a partial file and
+    identical images are stored once. Raises UploadTooLarge as soon as
+    max_bytes is passed. Blocking; async endpoints use save_upload.
+    """
+    if upload is None or not upload.filename:
+        return None
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    upload.file.seek(0)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := upload.file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+                digest.update(chunk)
+                out.write(chunk)
+
+        if size == 0:
+            os.remove(temp_path)
+            return None
+
+        file_path = f"{directory}/{digest.hexdigest()[:32]}{upload_extension(upload.filename)}"
+        if os.path.exists(file_path):
+            # Same content already stored
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, file_path)
+        return file_path
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+async def save_upload(upload: Optional[UploadFile], directory: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Optional[str]:
+    """store_upload run in the threadpool so the event loop never waits on disk"""
+    return await run_in_threadpool(store_upload, upload, directory, max_bytes)
+
+
+def store_image_upload(upload: Optional[UploadFile], directory: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Optional[str]:
+    """store_upload, then queue the resized / WebP variants in the background"""
+    file_path = store_upload(upload, directory, max_bytes)
+    image_variants.submit(file_path)
+    return file_path
+
+
+async def save_image_upload(upload: Optional[UploadFile], directory: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Optional[str]:
+    return await run_in_threadpool(store_image_upload, upload, directory, max_bytes)
+
+
+class UploadSizeLimitMiddleware:
+    """Reject multipart requests whose declared size is over the limit before reading the body"""
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            content_type = headers.get(b"content-type", b"")
+            content_length = headers.get(b"content-length", b"")
+            if (content_type.startswith(b"multipart/form-data") and content_length.isdigit()
+                    and int(content_length) > self.max_bytes):
+                body = json.dumps({"status": "error", "message": "Upload too large"}).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 413,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode())],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
@@ -10,9 +10,12 @@ import {
   Person as PersonIcon
 } from '@mui/icons-material';
 import axios from 'axios';
+import { useOrderEvents } from './orderEvents';
 
 const drawerWidth = 240;
 const API_BASE_URL = "http://127.0.0.1:8000";
+// A partner's live orders; DELIVERED ones are history and load on demand
+const ACTIVE_DELIVERY_STATUSES = ['PREPARING', 'OUT_FOR_DELIVERY'];
 
 const resolveImageUrl = (url) => {
   console.log("DeliveryDashboard: resolveImageUrl called with:", url);
@@ -69,6 +72,14 @@ const DeliveryDashboard = () => {
 
   const handleLogout = () => {
     console.log("DeliveryDashboard: Logout initiated");
+    // Revoke the token server-side; logging out locally doesn't wait for it.
+    // The header is set here because the interceptor runs after storage is cleared.
+    const token = localStorage.getItem('accessToken');
+    if (token) {
+      axios.post(`${API_BASE_URL}/auth/logout`, null, {
+        headers: { Authorization: `Bearer ${token}` }
+      }).catch(() => {});
+    }
     localStorage.clear();
     navigate('/login');
   };
@@ -278,13 +289,61 @@ const MyDeliveriesView = ({ userObj }) => {
   console.log("MyDeliveriesView: userObj received:", userObj);
   
   const [myOrders, setMyOrders] = useState([]);
-  const [allRestaurants, setAllRestaurants] = useState([]);
   const [loading, setLoading] = useState(true);
   const [actionLoading, setActionLoading] = useState(false);
+  // Completed deliveries are history: fetched only when asked for, one page at a time
+  const [completedOrders, setCompletedOrders] = useState([]);
+  const [historyLoaded, setHistoryLoaded] = useState(false);
+  const [historyCursor, setHistoryCursor] = useState(null);
+  const [historyLoading, setHistoryLoading] = useState(false);
 
   const partnerId = userObj?.delivery_partner?.id || userObj?.id;
   console.log("MyDeliveriesView: Resolved Partner ID:", partnerId);
 
+  const fetchBoardPage = (statuses, cursor, limit = 50) => axios.get(`${API_BASE_URL}/delivery/board`, {
+    params: {
+      partner_id: partnerId,
+      status: statuses,
+      limit,
+      ...(cursor ? { cursor } : {})
+    },
+    paramsSerializer: { indexes: null }
+  });
+
+  const formatOrder = (o) => {
+    const formatted = {
+      id: o.order_id,
+      status: o.status,
+      totalAmount: o.total_amount,
+      createdAt: o.created_at,
+      date: o.date,
+      orderImage: o.order_image,
+      deliveryPartnerId: o.delivery_partner_id,
+      
+      // Restaurant info
+      restaurantId: o.restaurant?.id,
+      restaurantName: o.restaurant?.name || 'Unknown Restaurant',
+      restaurantAddress: o.restaurant?.address || 'N/A',
+      
+      // User/Customer info
+      userId: o.user?.id,
+      userName: o.user?.name || 'Customer',
+      userAddress: o.user?.address || 'N/A',
+      userMobile: o.user?.mobile || 'N/A',
+      
+      // Order items
+      items: o.items?.map(item => ({
+        id: item.menu_id,
+        name: item.menu_item_name,
+        quantity: item.quantity,
+        menu_item_pic: item.menu_item_pic
+      })) || []
+    };
+    
+    console.log("MyDeliveriesView: Formatted order:", formatted);
+    return formatted;
+  };
+
   const fetchMyOrders = async () => {
     console.log("MyDeliveriesView: fetchMyOrders called");
     if (!partnerId) {
@@ -295,83 +354,24 @@ const MyDeliveriesView = ({ userObj }) => {
 
     console.log("MyDeliveriesView: Starting data fetch for partner ID:", partnerId);
     try {
-      // Step 1: Fetch all restaurants
-      console.log("MyDeliveriesView: Step 1 - Fetching all restaurants");
-      const restaurantsResponse = await axios.get(`${API_BASE_URL}/restaurants/`);
-      console.log("MyDeliveriesView: Restaurants response:", restaurantsResponse.data);
-      
-      const restaurants = restaurantsResponse.data.restaurants || [];
-      setAllRestaurants(restaurants);
-      console.log("MyDeliveriesView: Total restaurants found:", restaurants.length);
+      // Step 1: Fetch this partner's active orders from the delivery board (one request for all restaurants)
+      console.log("MyDeliveriesView: Step 1 - Fetching delivery board for partner ID:", partnerId);
+      let myAssignedOrders = [];
+      let cursor = null;
 
-      // Step 2: Fetch orders from each restaurant
-      console.log("MyDeliveriesView: Step 2 - Fetching orders from each restaurant");
-      let allOrders = [];
-      
-      for (const restaurant of restaurants) {
-        console.log(`MyDeliveriesView: Fetching orders for restaurant ID: ${restaurant.id} (${restaurant.name})`);
-        try {
-          const ordersResponse = await axios.get(`${API_BASE_URL}/orders/restaurant/${restaurant.id}`);
-          console.log(`MyDeliveriesView: Orders from ${restaurant.name}:`, ordersResponse.data);
-          
-          if (ordersResponse.data.orders) {
-            allOrders = [...allOrders, ...ordersResponse.data.orders];
-            console.log(`MyDeliveriesView: Added ${ordersResponse.data.orders.length} orders from ${restaurant.name}`);
-          }
-        } catch (err) {
-          console.error(`MyDeliveriesView: Failed to fetch orders from restaurant ${restaurant.id}:`, err);
-        }
-      }
+      do {
+        const boardResponse = await fetchBoardPage(ACTIVE_DELIVERY_STATUSES, cursor, 200);
+        console.log("MyDeliveriesView: Board response:", boardResponse.data);
 
-      console.log("MyDeliveriesView: Total orders fetched from all restaurants:", allOrders.length);
+        myAssignedOrders = [...myAssignedOrders, ...(boardResponse.data.orders || [])];
+        cursor = boardResponse.data.next_cursor;
+      } while (cursor);
 
-      // Step 3: Filter orders assigned to this delivery partner
-      console.log("MyDeliveriesView: Step 3 - Filtering orders for partner ID:", partnerId);
-      const myAssignedOrders = allOrders.filter(order => {
-        const isAssigned = order.delivery_partner_id === partnerId;
-        if (isAssigned) {
-          console.log(`MyDeliveriesView: Order ${order.order_id} is assigned to partner ${partnerId}`);
-        }
-        return isAssigned;
-      });
+      console.log("MyDeliveriesView: Active orders assigned to this partner:", myAssignedOrders.length);
 
-      console.log("MyDeliveriesView: Total orders assigned to this partner:", myAssignedOrders.length);
-
-      // Step 4: Format the orders
-      console.log("MyDeliveriesView: Step 4 - Formatting orders");
-      const formattedOrders = myAssignedOrders.map(o => {
-        const formatted = {
-          id: o.order_id,
-          status: o.status,
-          totalAmount: o.total_amount,
-          createdAt: o.created_at,
-          date: o.date,
-          orderImage: o.order_image,
-          deliveryPartnerId: o.delivery_partner_id,
-          
-          // Restaurant info
-          restaurantId: o.restaurant?.id,
-          restaurantName: o.restaurant?.name || 'Unknown Restaurant',
-          restaurantAddress: o.restaurant?.address || 'N/A',
-          
-          // User/Customer info
-          userId: o.user?.id,
-          userName: o.user?.name || 'Customer',
-          userAddress: o.user?.address || 'N/A',
-          userMobile: o.user?.mobile || 'N/A',
-          
-          // Order items
-          items: o.items?.map(item => ({
-            id: item.menu_id,
-            name: item.menu_item_name,
-            quantity: item.quantity,
-            menu_item_pic: item.menu_item_pic
-          })) || []
-        };
-        
-        console.log("MyDeliveriesView: Formatted order:", formatted);
-        return formatted;
-      });
+      // Step 2: Format the orders
+      console.log("MyDeliveriesView: Step 2 - Formatting orders");
+      const formattedOrders = myAssignedOrders.map(formatOrder);
 
       setMyOrders(formattedOrders);
       console.log("MyDeliveriesView: Successfully set orders in state");
@@ -386,11 +386,67 @@ const MyDeliveriesView = ({ userObj }) => {
     }
   };
 
+  // Without a cursor the first page replaces what is loaded; with one, older deliveries are appended
+  const fetchCompletedOrders = async (cursor = null) => {
+    if (!partnerId) return;
+    console.log("MyDeliveriesView: Fetching completed deliveries, cursor:", cursor);
+    setHistoryLoading(true);
+    try {
+      const boardResponse = await fetchBoardPage(['DELIVERED'], cursor);
+      const page = (boardResponse.data.orders || []).map(formatOrder);
+      setCompletedOrders(prev => {
+        if (!cursor) return page;
+        const seen = new Set(prev.map(o => o.id));
+        return [...prev, ...page.filter(o => !seen.has(o.id))];
+      });
+      setHistoryCursor(boardResponse.data.next_cursor || null);
+      setHistoryLoaded(true);
+    } catch (err) {
+      console.error("MyDeliveriesView: Failed to fetch completed deliveries:", err);
+    } finally {
+      setHistoryLoading(false);
+    }
+  };
+
   useEffect(() => {
     console.log("MyDeliveriesView: useEffect triggered - Initial fetch");
     fetchMyOrders();
   }, [partnerId]);
 
+  // Moves an order between the active list and history as its status changes.
+  // snapshot is the full board entry sent with newly assigned orders.
+  const applyOrderUpdate = (orderId, status, snapshot = null) => {
+    const current = snapshot ? formatOrder(snapshot) : myOrders.find(o => o.id === orderId);
+    if (!current) return;
+    const order = { ...current, status };
+
+    setMyOrders(prev => {
+      if (!ACTIVE_DELIVERY_STATUSES.includes(status)) {
+        return prev.filter(o => o.id !== orderId);
+      }
+      return prev.some(o => o.id === orderId)
+        ? prev.map(o => (o.id === orderId ? order : o))
+        : [order, ...prev];
+    });
+    if (status === 'DELIVERED' && historyLoaded) {
+      setCompletedOrders(prev => [order, ...prev.filter(o => o.id !== orderId)]);
+    }
+  };
+
+  useOrderEvents('partner', partnerId, {
+    onEvent: (event) => {
+      console.log("MyDeliveriesView: Order event:", event);
+      applyOrderUpdate(event.order_id, event.status, event.order);
+    },
+    onResync: () => {
+      console.log("MyDeliveriesView: Order events missed, re-fetching deliveries");
+      fetchMyOrders();
+      if (historyLoaded) {
+        fetchCompletedOrders();
+      }
+    }
+  });
+
   const handleMarkDelivered = async (orderId) => {
     console.log("MyDeliveriesView: handleMarkDelivered called for order:", orderId);
     
@@ -407,12 +463,19 @@ const MyDeliveriesView = ({ userObj }) => {
       const response = await axios.put(
         `${API_BASE_URL}/orders/${orderId}/status`,
         null,
-        { params: { status: 'DELIVERED' } }
+        { params: { status: 'DELIVERED', expected_status: 'OUT_FOR_DELIVERY' } }
       );
       console.log("MyDeliveriesView: Status update response:", response.data);
+      if (response.data.status === "error") {
+        // Someone else moved the order; show its real status
+        alert(response.data.message);
+        if (response.data.current_status) {
+          applyOrderUpdate(orderId, response.data.current_status);
+        }
+        return;
+      }
 
-      console.log("MyDeliveriesView: Refreshing orders list after delivery");
-      await fetchMyOrders();
+      applyOrderUpdate(orderId, 'DELIVERED');
       
       console.log("MyDeliveriesView: Order marked as delivered successfully");
       alert("Order marked as delivered!");
@@ -442,7 +505,6 @@ const MyDeliveriesView = ({ userObj }) => {
   }
 
   const activeOrders = myOrders.filter(o => o.status !== 'DELIVERED');
-  const completedOrders = myOrders.filter(o => o.status === 'DELIVERED');
   
   console.log("MyDeliveriesView: Active orders count:", activeOrders.length);
   console.log("MyDeliveriesView: Completed orders count:", completedOrders.length);
@@ -470,7 +532,7 @@ const MyDeliveriesView = ({ userObj }) => {
         <Grid item xs={12} sm={6}>
           <Paper sx={{ p: 2, bgcolor: '#f1f8e9', borderLeft: '4px solid #4caf50' }}>
             <Typography variant="h6" color="success.main" fontWeight="bold">
-              {completedOrders.length}
+              {historyLoaded ? `${completedOrders.length}${historyCursor ? '+' : ''}` : '–'}
             </Typography>
             <Typography variant="body2" color="text.secondary">
               Completed Deliveries
@@ -632,7 +694,11 @@ const MyDeliveriesView = ({ userObj }) => {
         Completed Deliveries
       </Typography>
       
-      {completedOrders.length === 0 ? (
+      {!historyLoaded ? (
+        <Button variant="outlined" color="success" disabled={historyLoading} onClick={() => fetchCompletedOrders()}>
+          {historyLoading ? <CircularProgress size={20} /> : "Show completed deliveries"}
+        </Button>
+      ) : completedOrders.length === 0 ? (
         <Typography variant="body2" sx={{ ml: 2, color: 'gray', fontStyle: 'italic' }}>
           No completed deliveries yet.
         </Typography>
@@ -673,6 +739,13 @@ const MyDeliveriesView = ({ userObj }) => {
           })}
         </Grid>
       )}
+      {historyLoaded && historyCursor && (
+        <Box sx={{ textAlign: 'center', mt: 2 }}>
+          <Button variant="outlined" color="success" disabled={historyLoading} onClick={() => fetchCompletedOrders(historyCursor)}>
+            {historyLoading ? <CircularProgress size={20} /> : "Load more"}
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 };
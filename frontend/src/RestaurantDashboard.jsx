@@ -9,6 +9,7 @@ import {
   Dashboard as DashIcon, Edit as EditIcon, Delete as DeleteIcon, AddBox, AccountCircle, ShoppingCart, ExitToApp, Menu as MenuIcon, LocalShipping
 } from '@mui/icons-material';
 import axios from 'axios';
+import { useOrderEvents } from './orderEvents';
 
 const NEXT_STATUS = {
   PLACED: "PREPARING",
@@ -16,9 +17,42 @@ const NEXT_STATUS = {
   OUT_FOR_DELIVERY: "DELIVERED"
 };
 
+// Orders still being worked on; completed ones are history and load page by page
+const ACTIVE_STATUSES = Object.keys(NEXT_STATUS);
+
 const drawerWidth = 240;
 const API_BASE_URL = "http://127.0.0.1:8000";
 
+// Order list / event snapshot entry -> the shape both order views render
+const formatOrder = (o) => ({
+  id: o.order_id,
+  status: o.status,
+  totalAmount: o.total_amount,
+  userId: o.user?.id,
+  userName: o.user?.name,
+  items: o.items?.map(item => ({
+    id: item.menu_id,
+    name: item.menu_item_name,
+    quantity: item.quantity,
+    menu_item_pic: item.menu_item_pic
+  })) || []
+});
+
+// Applies a live order event: new orders carry a snapshot, status changes patch in place.
+// Cancelled orders are dropped, neither view lists them.
+const applyOrderEvent = (orders, event) => {
+  let next;
+  if (event.order) {
+    const formatted = formatOrder(event.order);
+    next = orders.some(o => o.id === formatted.id)
+      ? orders.map(o => (o.id === formatted.id ? formatted : o))
+      : [formatted, ...orders];
+  } else {
+    next = orders.map(o => (o.id === event.order_id ? { ...o, status: event.status } : o));
+  }
+  return next.filter(o => o.status !== 'CANCELLED');
+};
+
 const resolveImageUrl = (url) => {
   console.log("resolveImageUrl called with:", url);
   if (!url) return "";
@@ -74,6 +108,14 @@ const RestaurantDashboard = () => {
 
   const handleLogout = () => {
     console.log("RestaurantDashboard: Logout initiated");
+    // Revoke the token server-side; logging out locally doesn't wait for it.
+    // The header is set here because the interceptor runs after storage is cleared.
+    const token = localStorage.getItem('accessToken');
+    if (token) {
+      axios.post(`${API_BASE_URL}/auth/logout`, null, {
+        headers: { Authorization: `Bearer ${token}` }
+      }).catch(() => {});
+    }
     localStorage.clear();
     navigate('/login');
   };
@@ -195,8 +237,20 @@ export const DashboardHome = ({ userObj }) => {
       const response = await axios.put(
         `${API_BASE_URL}/orders/${order.id}/status`,
         null,
-        { params: { status: nextStatus } }
+        { params: { status: nextStatus, expected_status: order.status } }
       );
+      if (response.data.status === "error") {
+        // Someone else moved the order; show its real status
+        alert(response.data.message);
+        if (response.data.current_status) {
+          setOrders(prev =>
+            prev.map(o =>
+              o.id === order.id ? { ...o, status: response.data.current_status } : o
+            )
+          );
+        }
+        return;
+      }
       console.log("DashboardHome: Order status update response:", response.data);
 
       setOrders(prev =>
@@ -213,6 +267,37 @@ export const DashboardHome = ({ userObj }) => {
     }
   };
 
+  // Every page of active orders; only present orders are shown here, no history
+  const fetchActiveOrders = async () => {
+    console.log("DashboardHome: Fetching active orders...");
+    let ordersArray = [];
+    let cursor = null;
+    do {
+      const ordersRes = await axios.get(`${API_BASE_URL}/orders/restaurant/${userObj.restaurant.id}`, {
+        params: { status: ACTIVE_STATUSES, limit: 200, ...(cursor ? { cursor } : {}) },
+        paramsSerializer: { indexes: null }
+      });
+      console.log("DashboardHome: Orders response:", ordersRes.data);
+      ordersArray = [...ordersArray, ...(ordersRes.data.orders || [])];
+      cursor = ordersRes.data.next_cursor;
+    } while (cursor);
+
+    const formattedOrders = ordersArray.map(formatOrder);
+    setOrders(formattedOrders);
+    console.log("DashboardHome: Total orders fetched:", formattedOrders.length);
+  };
+
+  useOrderEvents('restaurant', userObj?.restaurant?.id, {
+    onEvent: (event) => {
+      console.log("DashboardHome: Order event:", event);
+      setOrders(prev => applyOrderEvent(prev, event).filter(o => ACTIVE_STATUSES.includes(o.status)));
+    },
+    onResync: () => {
+      console.log("DashboardHome: Order events missed, re-fetching active orders");
+      fetchActiveOrders().catch(err => console.error("DashboardHome: Resync error:", err));
+    }
+  });
+
   useEffect(() => {
     console.log("DashboardHome: useEffect triggered");
     if (!userObj?.restaurant?.id) {
@@ -262,30 +347,7 @@ export const DashboardHome = ({ userObj }) => {
         setMenuItems(allItems);
         console.log("DashboardHome: Total menu items fetched:", allItems.length);
 
-        console.log("DashboardHome: Fetching orders...");
-        const ordersRes = await axios.get(`${API_BASE_URL}/orders/restaurant/${userObj.restaurant.id}`);
-        console.log("DashboardHome: Orders response:", ordersRes.data);
-        
-        const ordersArray = ordersRes.data.orders || [];
-        const formattedOrders = ordersArray.map(o => {
-          const formatted = {
-            id: o.order_id,
-            status: o.status,
-            totalAmount: o.total_amount,
-            userId: o.user?.id,
-            userName: o.user?.name,
-            items: o.items?.map(item => ({
-              id: item.menu_id,
-              name: item.menu_item_name,
-              quantity: item.quantity,
-              menu_item_pic: item.menu_item_pic
-            })) || []
-          };
-          console.log("DashboardHome: Formatted order:", formatted);
-          return formatted;
-        });
-        setOrders(formattedOrders);
-        console.log("DashboardHome: Total orders fetched:", formattedOrders.length);
+        await fetchActiveOrders();
 
       } catch (err) {
         console.error("DashboardHome: Fetch error:", err);
@@ -859,6 +921,8 @@ const OrdersView = ({ userObj }) => {
   const [assignDialogOpen, setAssignDialogOpen] = useState(false);
   const [selectedOrder, setSelectedOrder] = useState(null);
   const [selectedPartner, setSelectedPartner] = useState('');
+  const [historyCursor, setHistoryCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const handleCompleteOrder = async (order) => {
     console.log("OrdersView: handleCompleteOrder called for order:", order);
@@ -874,8 +938,20 @@ const OrdersView = ({ userObj }) => {
       const response = await axios.put(
         `${API_BASE_URL}/orders/${order.id}/status`,
         null,
-        { params: { status: nextStatus } }
+        { params: { status: nextStatus, expected_status: order.status } }
       );
+      if (response.data.status === "error") {
+        // Someone else moved the order; show its real status
+        alert(response.data.message);
+        if (response.data.current_status) {
+          setOrders(prev =>
+            prev.map(o =>
+              o.id === order.id ? { ...o, status: response.data.current_status } : o
+            )
+          );
+        }
+        return;
+      }
       console.log("OrdersView: Status update response:", response.data);
 
       setOrders(prev =>
@@ -907,15 +983,24 @@ const OrdersView = ({ userObj }) => {
       console.log("OrdersView: Assigning partner to order");
       const response = await axios.post(`${API_BASE_URL}/orders/${selectedOrder.id}/assign/${selectedPartner}`);
       console.log("OrdersView: Assignment response:", response.data);
+      if (response.data.status === "error") {
+        alert(response.data.message);
+        return;
+      }
       
       alert(`Delivery partner assigned successfully!`);
+      // Assigning sends the order out and takes the partner off the available list
+      setOrders(prev =>
+        prev.map(o =>
+          o.id === selectedOrder.id ? { ...o, status: "OUT_FOR_DELIVERY" } : o
+        )
+      );
+      setDeliveryPartners(prev =>
+        prev.map(p => (p.id === selectedPartner ? { ...p, is_available: false } : p))
+      );
       setAssignDialogOpen(false);
       setSelectedOrder(null);
       setSelectedPartner('');
-      
-      // Refresh orders
-      console.log("OrdersView: Refreshing orders after assignment");
-      fetchOrders();
     } catch (err) {
       console.error("OrdersView: Failed to assign delivery partner:", err);
       console.error("OrdersView: Error details:", err.response?.data);
@@ -923,6 +1008,16 @@ const OrdersView = ({ userObj }) => {
     }
   };
 
+  const formatOrders = (ordersArray) => ordersArray.map(formatOrder);
+
+  const fetchOrdersPage = (status, cursor) => axios.get(
+    `${API_BASE_URL}/orders/restaurant/${userObj.restaurant.id}`,
+    {
+      params: { status, ...(cursor ? { cursor } : {}) },
+      paramsSerializer: { indexes: null }
+    }
+  );
+
   const fetchOrders = async () => {
     console.log("OrdersView: fetchOrders called");
     if (!userObj?.restaurant?.id) {
@@ -933,39 +1028,70 @@ const OrdersView = ({ userObj }) => {
 
     console.log("OrdersView: Fetching orders for restaurant ID:", userObj.restaurant.id);
     try {
-      const res = await axios.get(`${API_BASE_URL}/orders/restaurant/${userObj.restaurant.id}`);
-      console.log("OrdersView: Orders response:", res.data);
-      
-      const ordersArray = res.data.orders || []; 
-      const formattedOrders = ordersArray.map(o => {
-        const formatted = {
-          id: o.order_id,
-          status: o.status,
-          totalAmount: o.total_amount,
-          userId: o.user?.id,
-          userName: o.user?.name,
-          items: o.items?.map(item => ({
-            id: item.menu_id,
-            name: item.menu_item_name,
-            quantity: item.quantity,
-            menu_item_pic: item.menu_item_pic
-          })) || []
-        };
-        console.log("OrdersView: Formatted order:", formatted);
-        return formatted;
-      });
-      
+      // Every active order, however many pages that takes
+      let activeArray = [];
+      let cursor = null;
+      do {
+        const res = await fetchOrdersPage(ACTIVE_STATUSES, cursor);
+        console.log("OrdersView: Active orders response:", res.data);
+        activeArray = [...activeArray, ...(res.data.orders || [])];
+        cursor = res.data.next_cursor;
+      } while (cursor);
+
+      // First page of completed orders; older ones load on demand
+      const historyRes = await fetchOrdersPage('DELIVERED');
+      console.log("OrdersView: Past orders response:", historyRes.data);
+
+      const formattedOrders = formatOrders([...activeArray, ...(historyRes.data.orders || [])]);
       setOrders(formattedOrders);
+      setHistoryCursor(historyRes.data.next_cursor || null);
       console.log("OrdersView: Total orders set:", formattedOrders.length);
     } catch (err) {
       console.error("OrdersView: Fetch error:", err);
       setOrders([]);
+      setHistoryCursor(null);
     } finally {
       setLoading(false);
       console.log("OrdersView: Orders fetch completed");
     }
   };
 
+  const loadMoreHistory = async () => {
+    if (!historyCursor) return;
+    console.log("OrdersView: Loading more past orders");
+    setLoadingMore(true);
+    try {
+      const res = await fetchOrdersPage('DELIVERED', historyCursor);
+      const olderOrders = formatOrders(res.data.orders || []);
+      // An order completed during this session may already be in the list
+      setOrders(prev => {
+        const seen = new Set(prev.map(o => o.id));
+        return [...prev, ...olderOrders.filter(o => !seen.has(o.id))];
+      });
+      setHistoryCursor(res.data.next_cursor || null);
+    } catch (err) {
+      console.error("OrdersView: Failed to load more past orders:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  useOrderEvents('restaurant', userObj?.restaurant?.id, {
+    onEvent: (event) => {
+      console.log("OrdersView: Order event:", event);
+      setOrders(prev => applyOrderEvent(prev, event));
+      if (event.type === 'order_assigned') {
+        setDeliveryPartners(prev =>
+          prev.map(p => (p.id === event.delivery_partner_id ? { ...p, is_available: false } : p))
+        );
+      }
+    },
+    onResync: () => {
+      console.log("OrdersView: Order events missed, re-fetching orders");
+      fetchOrders();
+    }
+  });
+
   useEffect(() => {
     console.log("OrdersView: useEffect - Initial data fetch");
     
@@ -1109,6 +1235,13 @@ const OrdersView = ({ userObj }) => {
           })}
         </Grid>
       )}
+      {historyCursor && (
+        <Box sx={{ textAlign: 'center', mt: 2 }}>
+          <Button variant="outlined" onClick={loadMoreHistory} disabled={loadingMore}>
+            {loadingMore ? <CircularProgress size={20} /> : "Load more"}
+          </Button>
+        </Box>
+      )}
 
       {/* Assign Delivery Partner Dialog */}
       <Dialog open={assignDialogOpen} onClose={() => {
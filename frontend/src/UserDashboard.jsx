@@ -9,13 +9,60 @@ import {
 } from '@mui/icons-material';
 
 import axios from 'axios';
+import { useOrderEvents, resolveEventImage } from './orderEvents';
 const drawerWidth = 240;
 
+// normalize items so UI can render safely
+const patchOrders = (ordersArray) => ordersArray.map(order => {
+  let items = [];
+
+  // handle string items
+  if (typeof order.items === "string") {
+    try {
+      items = JSON.parse(order.items);
+    } catch {
+      items = [];
+    }
+  }
+  // handle array items
+  else if (Array.isArray(order.items)) {
+    items = order.items.map(item => ({
+      food_id: item.menu_id || item.food_id,
+      name: item.menu?.name || item.item_name || "Unknown",
+      price: item.price || 0,
+      quantity: item.quantity || 1
+    }));
+  }
+
+  return {
+    ...order,
+    items,
+     total_amount: Number(order.total_amount) || 0
+  };
+});
+
+// Live order event -> order history: new orders carry a snapshot and go on top,
+// status changes are patched in place
+const applyOrderEvent = (orders, event) => {
+  if (event.order) {
+    const [order] = patchOrders([{ ...event.order, order_image: resolveEventImage(event.order.order_image) }]);
+    return orders.some(o => o.order_id === order.order_id)
+      ? orders.map(o => (o.order_id === order.order_id ? order : o))
+      : [order, ...orders];
+  }
+  return orders.map(o => (o.order_id === event.order_id ? { ...o, status: event.status } : o));
+};
+
 const UserDashboard = () => {
   const [orders, setOrders] = useState([]);
   const [refreshOrders, setRefreshOrders] = useState(0);
    const userObj = JSON.parse(localStorage.getItem("userObj"));
    console.log(" User object from localStorage:", userObj);
+  // Keeps the order history current on every tab; a full re-fetch only after missed events
+  useOrderEvents('user', userObj?.user?.id, {
+    onEvent: (event) => setOrders(prev => applyOrderEvent(prev, event)),
+    onResync: () => setRefreshOrders(prev => prev + 1)
+  });
   const [activeTab, setActiveTab] = useState('Dashboard');
   const navigate = useNavigate();
   const [selectedRestaurant, setSelectedRestaurant] = useState(null);
@@ -38,7 +85,15 @@ const displayHeaderName = userObj?.user?.name || " user profile";
 
   const handleLogout = () => {
      console.log("Logging out user:", userObj);
+   // The header is set here because the interceptor runs after storage is cleared
+   const token = localStorage.getItem('accessToken');
+   if (token) {
+     axios.post('http://127.0.0.1:8000/auth/logout', null, {
+       headers: { Authorization: `Bearer ${token}` }
+     }).catch(() => {});
+   }
    localStorage.removeItem('userObj');
+   localStorage.removeItem('accessToken');
 console.log(" User logged out, backend data preserved");
 navigate('/login');
   };
@@ -58,9 +113,6 @@ navigate('/login');
           setSelectedRestaurant={setSelectedRestaurant} 
         showNotify={showNotify}
   setActiveTab={setActiveTab}
-   setRefreshOrders={setRefreshOrders}
-    orders={orders}
-   setOrders={setOrders}
           />
 );
       case 'My Orders': 
@@ -162,7 +214,7 @@ navigate('/login');
     </Box>
   );
 };
-const BrowseRestaurants = ({ userObj, selectedRestaurant, setSelectedRestaurant, showNotify, setActiveTab, setRefreshOrders, setOrders }) => {
+const BrowseRestaurants = ({ userObj, selectedRestaurant, setSelectedRestaurant, showNotify, setActiveTab }) => {
   console.log("=== BrowseRestaurants: Component Rendering ===");
   console.log("BrowseRestaurants: userObj received:", userObj);
   
@@ -241,27 +293,9 @@ const BrowseRestaurants = ({ userObj, selectedRestaurant, setSelectedRestaurant,
       console.log("BrowseRestaurants: Order response:", res.data);
       setOpenOrderDialog(false);
       showNotify("Order placed successfully 🎉", "success");
-      
-      const newOrderId = res.data.order_id || Math.floor(Math.random() * 1000000);
-      console.log("BrowseRestaurants: New order ID:", newOrderId);
-      
-      setOrders(prev => [
-        ...prev,
-        {
-          id: newOrderId,
-          items: [{
-            food_id: selectedItem.id,
-            name: selectedItem.name,
-            price: selectedItem.price,
-            quantity
-          }],
-          status: "PLACED",
-          created_at: new Date().toISOString()
-        }
-      ]);
-      
+
+      // The order_created event adds the new order to the history
       setActiveTab("My Orders");
-      setRefreshOrders(prev => prev + 1);
       console.log("BrowseRestaurants: Order placed successfully");
 
     } catch (err) {
@@ -619,49 +653,27 @@ const BrowseRestaurants = ({ userObj, selectedRestaurant, setSelectedRestaurant,
 const UserOrdersView = ({orders, setOrders, userObj,showNotify, refreshOrders }) => {
  
   const [loading, setLoading] = useState(true);
-  const fetchOrders = async () => {
-   console.log("Fetching orders for user:", userObj.user.id);
-  try {
-    setLoading(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // One page of history, newest first; next_cursor points at the older ones
+  const fetchOrdersPage = async (cursor) => {
     const res = await axios.get(
-      `http://127.0.0.1:8000/orders/user/${userObj.user.id}/orders`
+      `http://127.0.0.1:8000/orders/user/${userObj.user.id}/orders`,
+      { params: cursor ? { cursor } : {} }
     );
     console.log("Orders API response:", res.data);
+    setNextCursor(res.data.next_cursor || null);
 
-
-// 🔥 ALWAYS FORCE ARRAY
-const ordersArray = Array.isArray(res.data.orders)
-  ? res.data.orders
-  : [];
-
-// normalize items so UI can render safely
-const patchedOrders = ordersArray.map(order => {
-  let items = [];
-
-  // handle string items
-  if (typeof order.items === "string") {
-    try {
-      items = JSON.parse(order.items);
-    } catch {
-      items = [];
-    }
-  }
-  // handle array items
-  else if (Array.isArray(order.items)) {
-    items = order.items.map(item => ({
-      food_id: item.menu_id || item.food_id,
-      name: item.menu?.name || item.item_name || "Unknown",
-      price: item.price || 0,
-      quantity: item.quantity || 1
-    }));
-  }
-
-  return {
-    ...order,
-    items,
-     total_amount: Number(order.total_amount) || 0
+    // 🔥 ALWAYS FORCE ARRAY
+    return patchOrders(Array.isArray(res.data.orders) ? res.data.orders : []);
   };
-});
+
+  const fetchOrders = async () => {
+   console.log("Fetching orders for user:", userObj.user.id);
+  try {
+    setLoading(true);
+    const patchedOrders = await fetchOrdersPage();
 
 setOrders(patchedOrders);
 
@@ -675,6 +687,22 @@ console.log("Orders received:", patchedOrders);
   }
 };
 
+const loadMoreOrders = async () => {
+  if (!nextCursor) return;
+  setLoadingMore(true);
+  try {
+    const olderOrders = await fetchOrdersPage(nextCursor);
+    setOrders(prev => {
+      const seen = new Set(prev.map(o => o.order_id));
+      return [...prev, ...olderOrders.filter(o => !seen.has(o.order_id))];
+    });
+  } catch (err) {
+    console.error(" Failed to load more orders:", err);
+  } finally {
+    setLoadingMore(false);
+  }
+};
+
 useEffect(() => {
   if (userObj?.user?.id) {
     fetchOrders();
@@ -692,7 +720,7 @@ useEffect(() => {
 
 
     return (
-          <Grid item xs={12} key={order.id}>
+          <Grid item xs={12} key={order.order_id}>
             <Paper elevation={2} sx={{ p: 3, borderRadius: 3, borderLeft: `6px solid ${order.status === 'Cancelled' ? '#d32f2f' : '#2e7d32'}` }}>
            <Box sx={{ display: "flex", gap: 2, alignItems: "center", mb: 2 }}>
   <Box sx={{ width: 80, height: 80, borderRadius: 2, overflow: "hidden", bgcolor: "#eee" }}>
@@ -739,6 +767,13 @@ useEffect(() => {
        )
        }
       </Grid>
+      {nextCursor && (
+        <Box sx={{ textAlign: 'center', mt: 3 }}>
+          <Button variant="outlined" color="success" onClick={loadMoreOrders} disabled={loadingMore}>
+            {loadingMore ? <CircularProgress size={20} color="success" /> : "Load more"}
+          </Button>
+        </Box>
+      )}
 
     </Box>
 
@@ -4,4 +4,17 @@ const API = axios.create({
   baseURL: 'http://127.0.0.1:8000', // Your FastAPI Local URL
 });
 
-export default API;
\ No newline at end of file
+// Send the token from the last login with every request
+const attachToken = (config) => {
+  const token = localStorage.getItem('accessToken');
+  if (token) {
+    config.headers.Authorization = `Bearer ${token}`;
+  }
+  return config;
+};
+
+API.interceptors.request.use(attachToken);
+// The dashboards call axios directly
+axios.interceptors.request.use(attachToken);
+
+export default API;
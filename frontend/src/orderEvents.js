@@ -0,0 +1,69 @@
+import { useEffect, useRef } from 'react';
+
+const EVENTS_BASE_URL = 'ws://127.0.0.1:8000/events/ws';
+const MAX_RECONNECT_DELAY_MS = 30000;
+
+// Relative image paths in event snapshots, made absolute like the list endpoints return them
+export const resolveEventImage = (path) =>
+  path && !path.startsWith('http') ? `http://127.0.0.1:8000${path.startsWith('/') ? '' : '/'}${path}` : path;
+
+/**
+ * Live order events for one restaurant / user / partner channel.
+ * onEvent gets every order event; onResync is called instead when the server
+ * reports dropped events (`missed`) and after a reconnect, since events sent
+ * while disconnected are lost - that is the only time the list is re-fetched.
+ */
+export const useOrderEvents = (channelType, channelId, { onEvent, onResync }) => {
+  // Latest handlers, so re-renders don't reopen the socket
+  const handlers = useRef({ onEvent, onResync });
+  handlers.current = { onEvent, onResync };
+
+  useEffect(() => {
+    if (!channelId) return undefined;
+
+    let socket = null;
+    let retryTimer = null;
+    let attempts = 0;
+    let closed = false;
+
+    const connect = () => {
+      socket = new WebSocket(`${EVENTS_BASE_URL}/${channelType}/${channelId}`);
+
+      socket.onopen = () => {
+        if (attempts > 0) handlers.current.onResync?.();
+        attempts = 0;
+      };
+
+      socket.onmessage = (message) => {
+        let event;
+        try {
+          event = JSON.parse(message.data);
+        } catch (err) {
+          console.error('Bad order event:', message.data);
+          return;
+        }
+        if (event.type === 'ping') return;
+        if (event.missed) {
+          handlers.current.onResync?.();
+          return;
+        }
+        handlers.current.onEvent?.(event);
+      };
+
+      socket.onclose = () => {
+        if (closed) return;
+        const delay = Math.min(1000 * 2 ** attempts, MAX_RECONNECT_DELAY_MS);
+        attempts += 1;
+        retryTimer = setTimeout(connect, delay);
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      socket?.close();
+    };
+  }, [channelType, channelId]);
+};
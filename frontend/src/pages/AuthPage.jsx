@@ -110,6 +110,9 @@ const AuthPage = () => {
           console.log("AuthPage: Final userObj to be stored:", userObj);
           localStorage.setItem('userObj', JSON.stringify(userObj));
           localStorage.setItem('role', currentRole);
+          if (response.data.access_token) {
+            localStorage.setItem('accessToken', response.data.access_token);
+          }
           
           console.log("AuthPage: Navigating to:", `/${dashboardRoute}`);
           navigate(`/${dashboardRoute}`);